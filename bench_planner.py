@@ -0,0 +1,41 @@
+﻿"""
+Compare the per-course fetch path against the Planner API backend.
+Prints request count and wall time for each (Canvas response cache off).
+"""
+import json
+import time
+
+import server
+
+
+def measure(label: str, **kwargs) -> dict:
+    calls = {"n": 0}
+    real_request = server._canvas_request
+
+    def counting_request(*args, **kw):
+        calls["n"] += 1
+        return real_request(*args, **kw)
+
+    server._canvas_request = counting_request
+    try:
+        t0 = time.perf_counter()
+        items = server.list_all_assignments(**kwargs)
+        elapsed = time.perf_counter() - t0
+    finally:
+        server._canvas_request = real_request
+
+    return {"path": label, "requests": calls["n"], "items": len(items), "seconds": round(elapsed, 3)}
+
+
+def main() -> None:
+    server._CANVAS_CACHE.enabled = False
+    results = [
+        measure("per-course"),
+        measure("bulk", bulk=True),
+        measure("planner", planner=True),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
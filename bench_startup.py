@@ -0,0 +1,93 @@
+﻿"""
+Cold-start budget for server.py.
+Measures `import server` time and time until the first tools/list response
+over stdio, and checks heavy dependencies stay unloaded at import.
+Exits non-zero when a budget is exceeded.
+
+    python bench_startup.py [--runs 5] [--import-budget 1.0] [--list-tools-budget 2.0]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).parent
+LAZY_MODULES = ("googleapiclient", "google_auth_oauthlib", "pdfminer", "bs4", "dateparser", "msal")
+
+
+def time_import() -> float:
+    code = (
+        "import json, sys, time; t = time.perf_counter(); import server; "
+        "print(json.dumps({'seconds': time.perf_counter() - t, "
+        f"'loaded': [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    if result["loaded"]:
+        raise SystemExit(f"Heavy modules loaded at import: {', '.join(result['loaded'])}")
+    return result["seconds"]
+
+
+def time_first_list_tools() -> float:
+    env = {**os.environ, "CANVAS_API_TOKEN": os.getenv("CANVAS_API_TOKEN") or "bench"}
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "server.py"], cwd=HERE, env=env,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        def send(msg: dict) -> None:
+            proc.stdin.write(json.dumps(msg) + "\n")
+            proc.stdin.flush()
+
+        def wait_for(msg_id: int) -> dict:
+            for line in proc.stdout:
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    continue
+                if msg.get("id") == msg_id:
+                    return msg
+            raise SystemExit("server exited before answering")
+
+        send({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+            "protocolVersion": "2024-11-05", "capabilities": {},
+            "clientInfo": {"name": "bench_startup", "version": "0"},
+        }})
+        wait_for(1)
+        send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        send({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        wait_for(2)
+        return time.perf_counter() - t0
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--import-budget", type=float, default=1.0, help="seconds (median)")
+    ap.add_argument("--list-tools-budget", type=float, default=2.0, help="seconds (median)")
+    args = ap.parse_args()
+
+    imports = [time_import() for _ in range(args.runs)]
+    first_list = [time_first_list_tools() for _ in range(args.runs)]
+    result = {
+        "import_median_s": round(statistics.median(imports), 3),
+        "first_list_tools_median_s": round(statistics.median(first_list), 3),
+        "import_budget_s": args.import_budget,
+        "list_tools_budget_s": args.list_tools_budget,
+    }
+    print(json.dumps(result, indent=2))
+
+    if result["import_median_s"] > args.import_budget or result["first_list_tools_median_s"] > args.list_tools_budget:
+        raise SystemExit("Cold-start budget exceeded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Offline checks for syllabus date extraction (no Canvas access needed).
+Run with pytest or directly: python date_parse_test.py
+"""
+from datetime import datetime
+
+from server import _extract_dates_from_text
+
+REFERENCE = datetime(2026, 10, 17)
+
+
+def _dates(text: str) -> list[tuple[str, str, str]]:
+    return [(e["name"], e["start_date"], e["end_date"])
+            for e in _extract_dates_from_text(text, "Course", REFERENCE)]
+
+
+def test_month_prefixed_words_are_not_dates():
+    # "marked" / "decided" / "junior" start like Mar / Dec / Jun
+    assert _dates("Quiz 3 marked 10 points") == []
+    assert _dates("Exam decided 3 weeks later") == []
+    assert _dates("Quiz grades junior 5") == []
+
+
+def test_month_names_and_abbreviations():
+    assert _dates("Midterm Exam\nOct 30, 2026 2-4pm") == [
+        ("Midterm Exam", "2026-10-30T14:00:00", "2026-10-30T16:00:00")]
+    assert _dates("Final exam: Dec. 11 2-5pm") == [
+        ("Final Exam", "2026-12-11T14:00:00", "2026-12-11T17:00:00")]
+    assert _dates("Exam on September 14, 2026") == [
+        ("Exam", "2026-09-14T09:00:00", "2026-09-14T10:00:00")]
+    assert _dates("Quiz Sept 4") == [("Quiz", "2027-09-04T09:00:00", "2027-09-04T10:00:00")]
+
+
+if __name__ == "__main__":
+    test_month_prefixed_words_are_not_dates()
+    test_month_names_and_abbreviations()
+    print("ok")
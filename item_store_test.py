@@ -0,0 +1,104 @@
+"""
+Offline checks for the SQLite item store behind the sync tools and
+canvas:// resources, each against a fresh store in a temp directory.
+Run with pytest or directly: python item_store_test.py
+"""
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from server import _ItemStore
+
+
+def _store() -> _ItemStore:
+    return _ItemStore(Path(tempfile.mkdtemp()) / "items.sqlite3")
+
+
+def _item(course_id: int, item_id: int, due: str, kind: str = "assignment") -> dict:
+    key = "due_date" if kind == "assignment" else "start_date"
+    return {"type": kind, "course_id": course_id, "id": item_id, "name": f"{kind} {item_id}", key: due}
+
+
+def _ids(items: list[dict]) -> list[int]:
+    return [it["id"] for it in items]
+
+
+def test_window_replace_only_drops_rows_inside_the_window():
+    store = _store()
+    store.upsert_items([
+        _item(5, 1, "2026-08-01T12:00:00Z"),  # before the window
+        _item(5, 2, "2026-09-17T03:00:00Z"),  # on the window's first day: kept as slack
+        _item(5, 3, "2026-10-20T12:00:00Z"),  # inside, gone from Canvas
+        _item(5, 4, "2026-10-21T12:00:00Z"),  # inside, refetched
+        _item(5, 5, "2027-04-15T12:00:00Z"),  # on the window's last day: kept as slack
+        _item(6, 6, "2026-10-20T12:00:00Z"),  # other course, not replaced
+    ])
+    store.upsert_items([_item(5, 4, "2026-10-22T12:00:00Z")], replace_courses=[5],
+                       window=("2026-09-17", "2027-04-15"))
+    assert _ids(store.items(course_id=5)) == [1, 2, 4, 5]
+    assert store.items(course_id=5)[2]["due_date"] == "2026-10-22T12:00:00Z"
+    assert _ids(store.items(course_id=6)) == [6]
+
+
+def test_replace_without_window_drops_all_rows_of_the_course():
+    store = _store()
+    store.upsert_items([_item(5, 1, "2026-08-01T12:00:00Z"), _item(5, 2, "2026-10-20T12:00:00Z")])
+    store.upsert_items([_item(5, 2, "2026-10-20T12:00:00Z")], replace_courses=[5])
+    assert _ids(store.items()) == [2]
+
+
+def test_paging_is_stable_across_inserts():
+    store = _store()
+    store.upsert_items([_item(1, i, f"2026-11-{i:02d}T10:00:00Z") for i in range(1, 6)])
+
+    first, cursor = store.page(limit=2)
+    assert _ids(first) == [1, 2] and cursor
+
+    # One row sorting before the cursor, one after: the first must not shift
+    # later pages, the second shows up once
+    store.upsert_items([_item(1, 100, "2026-10-01T10:00:00Z"), _item(1, 101, "2026-11-03T12:00:00Z")])
+
+    seen = list(_ids(first))
+    while cursor:
+        page, cursor = store.page(limit=2, cursor=cursor)
+        seen.extend(_ids(page))
+    assert seen == [1, 2, 3, 101, 4, 5]
+
+
+def test_last_page_has_no_cursor():
+    store = _store()
+    store.upsert_items([_item(1, i, f"2026-11-{i:02d}T10:00:00Z") for i in range(1, 5)])
+    page, cursor = store.page(limit=2)
+    page, cursor = store.page(limit=2, cursor=cursor)
+    assert _ids(page) == [3, 4] and cursor is None  # exactly full: the limit + 1 probe finds nothing
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        _store().page(cursor="not-a-cursor", limit=2)
+
+
+def test_since_until_filtering():
+    store = _store()
+    store.upsert_items([
+        _item(1, 1, "2026-10-20T23:00:00Z"),
+        _item(1, 2, "2026-10-21T00:00:00-05:00", kind="event"),  # 05:00Z on the 21st
+        _item(1, 3, "2026-10-22T00:00:00Z"),
+        {"type": "event", "course_id": 1, "id": 4, "name": "undated"},
+    ])
+    assert _ids(store.items(since="2026-10-21")) == [2, 3]  # since is inclusive
+    assert _ids(store.items(until="2026-10-22")) == [1, 2]  # until is exclusive
+    assert _ids(store.items(since="2026-10-21T06:00:00Z", until="2026-10-23")) == [3]
+    assert _ids(store.items(item_type="event", since="2026-10-01")) == [2]
+    assert len(store.items()) == 4  # undated rows only drop out when filtering by time
+
+
+if __name__ == "__main__":
+    test_window_replace_only_drops_rows_inside_the_window()
+    test_replace_without_window_drops_all_rows_of_the_course()
+    test_paging_is_stable_across_inserts()
+    test_last_page_has_no_cursor()
+    test_invalid_cursor_is_rejected()
+    test_since_until_filtering()
+    print("ok")
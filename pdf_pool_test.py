@@ -0,0 +1,87 @@
+"""
+Offline check that syllabus PDFs still extract when the scan runs on the
+threaded per-course path (fetch_courses_concurrently), with Canvas stubbed.
+Run with pytest or directly: python pdf_pool_test.py
+"""
+import server
+
+
+def _mkpdf(lines: list[str]) -> bytes:
+    """Smallest one-page PDF pdfminer can read, one text line per entry."""
+    content = "BT /F1 12 Tf 72 720 Td 14 TL " + " ".join(f"({l}) Tj T*" for l in lines) + " ET"
+    objs = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out, offsets = "%PDF-1.4\n", []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{off:010d} 00000 n \n" for off in offsets)
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+
+PDF = _mkpdf(["Midterm Exam", "Oct 30, 2026 2-4pm"])
+
+
+class _Resp:
+    def __init__(self, body, raw: bytes = b""):
+        self._body, self._raw = body, raw
+        self.status_code, self.headers, self.links = 200, {}, {}
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield self._raw
+
+    def close(self):
+        pass
+
+
+class _Session:
+    headers: dict = {}
+
+    def get(self, url, params=None, **kwargs):
+        if url.endswith("/files"):
+            return _Resp([{"id": 1, "display_name": "Syllabus.pdf", "content-type": "application/pdf",
+                           "size": len(PDF), "url": "https://files.example/syllabus.pdf"}])
+        if url.startswith("https://files.example/"):
+            return _Resp(None, PDF)
+        course_id = int(url.rsplit("/", 1)[1])
+        return _Resp({"id": course_id, "name": f"Course {course_id}", "syllabus_body": ""})
+
+
+def test_extraction_inside_fetch_courses_concurrently():
+    saved = (server.CANVAS_BASE, server.CANVAS_TOKEN, server._canvas_session,
+             server._CANVAS_CACHE.enabled, server._SYLLABUS_CACHE.enabled)
+    server.CANVAS_BASE = server.CANVAS_BASE or "https://canvas.example"
+    server.CANVAS_TOKEN = server.CANVAS_TOKEN or "test-token"
+    server._canvas_session = lambda: _Session()
+    server._CANVAS_CACHE.enabled = False
+    server._SYLLABUS_CACHE.enabled = False
+    courses = [{"id": i, "name": f"Course {i}"} for i in range(1, 9)]
+    try:
+        results = server.fetch_courses_concurrently(courses, [server.scan_syllabus_for_dates], 8)
+    finally:
+        server._reset_pdf_pool()
+        (server.CANVAS_BASE, server.CANVAS_TOKEN, server._canvas_session,
+         server._CANVAS_CACHE.enabled, server._SYLLABUS_CACHE.enabled) = saved
+    for items in results:
+        assert [it["type"] for it in items] == ["event"], items
+        assert items[0]["name"] == "Midterm Exam"
+
+
+if __name__ == "__main__":
+    test_extraction_inside_fetch_courses_concurrently()
+    print("ok")
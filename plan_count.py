@@ -1,3 +1,5 @@
 ﻿from server import list_all_assignments
-items = list_all_assignments(include_syllabus=True)
-print("WILL SYNC:", len(items))
+
+if __name__ == "__main__":
+    items = list_all_assignments(include_syllabus=True)
+    print("WILL SYNC:", len(items))
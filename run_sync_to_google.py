@@ -4,7 +4,8 @@ from server import (
     list_courses,
     list_all_assignments,
     get_gcal_service,
-    create_google_event,
+    reconcile_gcal_index,
+    batch_upsert_google_events,
 )
 
 
@@ -20,14 +21,17 @@ def main() -> None:
     print("Authorizing Google Calendar service...")
     service = get_gcal_service()
 
+    print("Reconciling existing Canvas events...")
+    reconcile_gcal_index(service, "primary")
+
     synced = 0
     errors: list[str] = []
-    for it in items:
-        try:
-            create_google_event(service, it, calendar_id="primary")
+    upserts = batch_upsert_google_events(service, items, calendar_id="primary", index_complete=True)
+    for it, _, err in upserts:
+        if err is None:
             synced += 1
-        except Exception as e:
-            errors.append(f"{it.get('name')}: {e}")
+        else:
+            errors.append(f"{it.get('name')}: {err}")
 
     print(json.dumps({"synced": synced, "errors": errors[:20]}, indent=2))
 
@@ -1,13 +1,16 @@
-﻿# Google Calendar
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+﻿# Heavy optional stacks (googleapiclient, google-auth, bs4, pdfminer,
+# dateparser, msal) are imported inside the functions that need them so
+# starting the server, check_configuration and fetch_courses stay fast.
 import hashlib
 
 # --- BEGIN FIXED HEADER (put this at the very top) ---
 import os
+import json
+import threading
+import contextvars
+import time
 import requests
+import requests.adapters
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -20,29 +23,286 @@ if ENV_PATH.exists():
 CANVAS_BASE = (os.getenv("CANVAS_BASE_URL") or "").rstrip("/")
 CANVAS_TOKEN = os.getenv("CANVAS_API_TOKEN") or ""
 
-def _canvas_get(path: str, params: dict | None = None):
-    """Minimal Canvas GET helper."""
+_CANVAS_SESSION: requests.Session | None = None
+_CANVAS_SESSION_LOCK = threading.Lock()
+CANVAS_POOL_SIZE = int(os.getenv("CANVAS_POOL_SIZE") or 16)
+
+def _canvas_session() -> requests.Session:
+    """Shared keep-alive session so Canvas calls reuse pooled TLS connections."""
+    global _CANVAS_SESSION
+    if _CANVAS_SESSION is None:
+        with _CANVAS_SESSION_LOCK:
+            if _CANVAS_SESSION is None:
+                s = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=CANVAS_POOL_SIZE, pool_maxsize=CANVAS_POOL_SIZE
+                )
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                s.headers["Authorization"] = f"Bearer {CANVAS_TOKEN}"
+                _CANVAS_SESSION = s
+    return _CANVAS_SESSION
+
+class _CanvasThrottle:
+    """
+    Shared limiter for Canvas's leaky-bucket quota.
+    Reads X-Rate-Limit-Remaining / X-Request-Cost from every response and
+    adapts how many requests may be in flight: grows by one while the bucket
+    is healthy, halves and pauses as it nears empty, so we slow down before
+    Canvas starts answering 403 "Rate Limit Exceeded".
+    """
+
+    def __init__(self, max_in_flight: int, low_water: float, leak_per_sec: float):
+        self.max_in_flight = max_in_flight
+        self.low_water = low_water
+        self.leak_per_sec = leak_per_sec
+        self.limit = max_in_flight
+        self.in_flight = 0
+        self.remaining: float | None = None
+        self.last_cost = 0.0
+        self.pause_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                wait = self.pause_until - time.monotonic()
+                if wait <= 0 and self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, response: requests.Response | None) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if response is not None:
+                self._observe(response)
+            self._cond.notify_all()
+
+    def _observe(self, response: requests.Response) -> None:
+        try:
+            remaining = float(response.headers["X-Rate-Limit-Remaining"])
+        except (KeyError, ValueError):
+            remaining = None
+        try:
+            self.last_cost = float(response.headers.get("X-Request-Cost") or 0)
+        except ValueError:
+            pass
+
+        if _is_canvas_rate_limited(response):
+            remaining = 0.0
+        if remaining is None:
+            return
+        self.remaining = remaining
+
+        # Budget the in-flight requests could still spend before we hear back
+        projected = remaining - self.last_cost * self.in_flight
+        if projected <= self.low_water:
+            self.limit = max(1, self.limit // 2)
+            deficit = self.low_water - projected + self.last_cost
+            self.pause_until = max(self.pause_until, time.monotonic() + deficit / self.leak_per_sec)
+        elif projected > 2 * self.low_water and self.limit < self.max_in_flight:
+            self.limit += 1
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "remaining": self.remaining,
+                "last_cost": self.last_cost,
+            }
+
+
+def _is_canvas_rate_limited(response: requests.Response) -> bool:
+    return response.status_code == 403 and "rate limit exceeded" in (response.text or "").lower()
+
+
+CANVAS_RATE_LOW_WATER = float(os.getenv("CANVAS_RATE_LOW_WATER") or 150)
+CANVAS_RATE_LEAK_PER_SEC = float(os.getenv("CANVAS_RATE_LEAK_PER_SEC") or 10)
+CANVAS_RATE_RETRIES = 3
+_CANVAS_THROTTLE = _CanvasThrottle(CANVAS_POOL_SIZE, CANVAS_RATE_LOW_WATER, CANVAS_RATE_LEAK_PER_SEC)
+
+def _canvas_request(url: str, params: dict | None = None, **kwargs) -> requests.Response:
+    """GET through the shared session and throttle; waits out 403 rate-limit replies."""
+    attempt = 0
+    while True:
+        _CANVAS_THROTTLE.acquire()
+        r = None
+        try:
+            r = _canvas_session().get(url, params=params, **kwargs)
+        finally:
+            _CANVAS_THROTTLE.release(r)
+        if not _is_canvas_rate_limited(r) or attempt >= CANVAS_RATE_RETRIES:
+            return r
+        attempt += 1
+
+def _evict_lru(directory: Path, max_bytes: int) -> int:
+    """Delete least-recently-used *.json entries until `directory` fits in max_bytes."""
+    try:
+        files = [(f, f.stat()) for f in directory.glob("*.json")]
+    except OSError:
+        return 0
+    total = sum(st.st_size for _, st in files)
+    evicted = 0
+    for f, st in sorted(files, key=lambda x: x[1].st_mtime):
+        if total <= max_bytes:
+            break
+        try:
+            f.unlink()
+            total -= st.st_size
+            evicted += 1
+        except OSError:
+            pass
+    return evicted
+
+
+class _CanvasResponseCache:
+    """
+    On-disk conditional-GET cache for Canvas JSON responses.
+    Stores body + ETag/Last-Modified per (token, URL, params) and revalidates
+    with If-None-Match / If-Modified-Since, so unchanged data comes back as a
+    bodiless 304. Evicts least-recently-used entries past `max_bytes`.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _key(self, url: str, params: dict | None) -> str:
+        token = hashlib.sha256(CANVAS_TOKEN.encode("utf-8")).hexdigest()[:16]
+        raw = json.dumps([token, url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, url: str, params: dict | None) -> tuple[str, dict | None]:
+        key = self._key(url, params)
+        if not self.enabled:
+            return key, None
+        try:
+            return key, json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return key, None
+
+    def validators(self, entry: dict | None) -> dict:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def hit(self, key: str) -> None:
+        with self._lock:
+            self.hits += 1
+        try:
+            os.utime(self._path(key))  # bump LRU position
+        except OSError:
+            pass
+
+    def store(self, key: str, response: requests.Response, body, next_url: str | None) -> None:
+        with self._lock:
+            self.misses += 1
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not self.enabled or not (etag or last_modified):
+            return
+        entry = {"etag": etag, "last_modified": last_modified, "next": next_url, "body": body}
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self._path(key).with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(entry), encoding="utf-8")
+            os.replace(tmp, self._path(key))
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            self.evictions += _evict_lru(self.directory, self.max_bytes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+CANVAS_CACHE_DIR = Path(os.getenv("CANVAS_CACHE_DIR") or Path(__file__).with_name(".canvas_cache"))
+CANVAS_CACHE_MAX_BYTES = int(os.getenv("CANVAS_CACHE_MAX_BYTES") or 50 * 1024 * 1024)
+_CANVAS_CACHE = _CanvasResponseCache(
+    CANVAS_CACHE_DIR,
+    CANVAS_CACHE_MAX_BYTES,
+    enabled=(os.getenv("CANVAS_CACHE") or "1") != "0",
+)
+
+def _canvas_url(path: str) -> str:
     if not CANVAS_BASE or not CANVAS_TOKEN:
         raise RuntimeError("Canvas not configured. Set CANVAS_BASE_URL and CANVAS_API_TOKEN in .env")
-    url = f"{CANVAS_BASE}/api/v1/{path.lstrip('/')}"
-    r = requests.get(
-        url,
-        headers={"Authorization": f"Bearer {CANVAS_TOKEN}"},
-        params=params or {},
-        timeout=30,
-    )
+    return f"{CANVAS_BASE}/api/v1/{path.lstrip('/')}"
+
+def _canvas_fetch_page(url: str, params: dict | None):
+    """One Canvas JSON page through the conditional-GET cache -> (body, next_url)."""
+    key, entry = _CANVAS_CACHE.load(url, params)
+    r = _canvas_request(url, params=params, headers=_CANVAS_CACHE.validators(entry), timeout=30)
+    if r.status_code == 304 and entry is not None:
+        _CANVAS_CACHE.hit(key)
+        return entry["body"], r.links.get("next", {}).get("url") or entry.get("next")
     r.raise_for_status()
-    return r.json()
+    body = r.json()
+    next_url = r.links.get("next", {}).get("url")
+    _CANVAS_CACHE.store(key, r, body, next_url)
+    return body, next_url
+
+def _canvas_get(path: str, params: dict | None = None):
+    """Minimal Canvas GET helper (first page only; use _canvas_paginate for lists)."""
+    body, _ = _canvas_fetch_page(_canvas_url(path), params or {})
+    return body
+
+def _canvas_paginate(path: str, params: dict | None = None):
+    """
+    Yield items from a Canvas list endpoint, following Link: rel="next" headers.
+    Pages are fetched lazily, so callers can stream without building the full list.
+    """
+    url = _canvas_url(path)
+    params = {"per_page": 100, **(params or {})}
+    while url:
+        page, next_url = _canvas_fetch_page(url, params)
+        if isinstance(page, dict):
+            # Non-list endpoint: nothing to page through
+            yield page
+            return
+        yield from page
+        # The next link already carries the query string
+        url = next_url
+        params = None
+
+def _canvas_get_all(path: str, params: dict | None = None) -> list:
+    """All pages of a Canvas list endpoint as one list."""
+    return list(_canvas_paginate(path, params))
 
 # Plain helpers you want to import in tests
 def list_courses():
-    return _canvas_get("courses", {"enrollment_state": "active", "per_page": 100})
+    return _canvas_get_all("courses", {"enrollment_state": "active"})
 
 def list_course_assignments(course_id: int):
-    return _canvas_get(f"courses/{course_id}/assignments", {"per_page": 100})
+    return _canvas_get_all(f"courses/{course_id}/assignments")
 def list_all_assignments(
     include_syllabus: bool = False,
-    course_ids: list[int] | None = None
+    course_ids: list[int] | None = None,
+    concurrency: int | None = None,
+    bulk: bool = False,
+    planner: bool = False,
 ) -> list[dict]:
     """
     Return a flat list of items across courses:
@@ -50,46 +310,70 @@ def list_all_assignments(
       - Canvas calendar events (quizzes/exams posted as events)
       - (optional) syllabus-derived exam dates if include_syllabus=True
     Each item will include 'course_id' and 'course_name'.
+    Courses are fetched in parallel (at most `concurrency` calls in flight,
+    default CANVAS_CONCURRENCY); output stays in course order.
+    bulk=True reads assignments/events through multi-course calendar_events
+    requests (see get_calendar_items_bulk) instead of per-course calls.
+    planner=True reads them from the Planner API (see list_planner_items)
+    and skips the course listing entirely.
     """
-    courses = [c for c in get_all_courses() if "error" not in c]
-    out: list[dict] = []
-
-    for c in courses:
-        cid, cname = c["id"], c["name"]
-        if course_ids and cid not in course_ids:
-            continue
+    if planner:
+        return _list_all_from_planner(include_syllabus, course_ids, concurrency)
 
-        try:
-            assigns = get_course_assignments(cid) or []
-        except Exception:
-            assigns = []
-
-        try:
-            events = get_course_calendar_events(cid) or []
-        except Exception:
-            events = []
-
-        items = assigns + events
+    courses = [c for c in get_all_courses() if "error" not in c]
+    if course_ids:
+        courses = [c for c in courses if c["id"] in course_ids]
 
+    if bulk:
+        fetchers = [scan_syllabus_for_dates] if include_syllabus else []
+        calendar = get_calendar_items_bulk([c["id"] for c in courses], concurrency=concurrency)
+    else:
+        fetchers = [get_course_assignments, get_course_calendar_events]
         if include_syllabus:
-            try:
-                syl = scan_syllabus_for_dates(cid) or []
-                items += syl
-            except Exception:
-                pass
-
-        for it in items:
-            it.setdefault("course_id", cid)
-            it.setdefault("course_name", cname)
+            fetchers.append(scan_syllabus_for_dates)
+        calendar = {}
+
+    out: list[dict] = []
+    for c, items in zip(courses, fetch_courses_concurrently(courses, fetchers, concurrency)):
+        for it in calendar.get(c["id"], []) + items:
+            it.setdefault("course_id", c["id"])
+            it.setdefault("course_name", c["name"])
             out.append(it)
 
     return out
+
+def _list_all_from_planner(
+    include_syllabus: bool,
+    course_ids: list[int] | None,
+    concurrency: int | None,
+) -> list[dict]:
+    items = list_planner_items()
+    if course_ids:
+        items = [it for it in items if it["course_id"] in course_ids]
+    if not include_syllabus:
+        return items
+
+    # Syllabus scan still needs a per-course pass; planner tells us which courses matter
+    courses = list({it["course_id"]: {"id": it["course_id"], "name": it["course_name"]}
+                    for it in items}.values())
+    for c, syl in zip(courses, fetch_courses_concurrently(courses, [scan_syllabus_for_dates], concurrency)):
+        for it in syl:
+            it.setdefault("course_id", c["id"])
+            it.setdefault("course_name", c["name"])
+            items.append(it)
+    return items
 # --- END FIXED HEADER ---
-from io import BytesIO
-from bs4 import BeautifulSoup
-from pdfminer.high_level import extract_text
-import dateparser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import lru_cache
+import math
+import multiprocessing
 import re
+import signal
+import tempfile
+from typing import BinaryIO
 
 def _canvas_get_json(path: str, params: dict | None = None):
     return _canvas_get(path, params or {})
@@ -101,19 +385,216 @@ def _canvas_get_course(course_id: int):
     except Exception:
         return _canvas_get_json(f"courses/{course_id}")
 
-def _canvas_list_files(course_id: int, per_page: int = 100):
-    # Best-effort: bump page size; add real pagination later if needed
-    return _canvas_get_json(f"courses/{course_id}/files", {"per_page": per_page})
-
-def _download_canvas_file(file_obj: dict) -> bytes:
+def _canvas_list_files(
+    course_id: int,
+    per_page: int = 100,
+    content_types: tuple[str, ...] | None = None,
+    search_term: str | None = None,
+):
+    """
+    List course files, letting Canvas do the filtering: content_types limits
+    by MIME type and search_term (2+ chars) matches the file name.
+    """
+    params: dict = {"per_page": per_page}
+    if content_types:
+        params["content_types[]"] = list(content_types)
+    if search_term and len(search_term) >= 2:
+        params["search_term"] = search_term
+    return _canvas_get_all(f"courses/{course_id}/files", params)
+
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES") or 25 * 1024 * 1024)
+_DOWNLOAD_CHUNK = 64 * 1024
+
+def _download_canvas_file(file_obj: dict, dest: BinaryIO, max_bytes: int | None = None,
+                          magic: bytes | None = None) -> int:
+    """
+    Stream a Canvas file into `dest` chunk by chunk and return the byte count.
+    Aborts once more than `max_bytes` arrive, or when the first chunk does not
+    contain `magic` (e.g. b"%PDF-"), so memory stays flat regardless of file size.
+    """
     # Canvas file objects usually include a signed 'url' or 'download_url'
     url = file_obj.get("url") or file_obj.get("download_url")
     if not url:
         raise RuntimeError("File has no downloadable URL")
-    r = requests.get(url, headers={"Authorization": f"Bearer {CANVAS_TOKEN}"},
-                     timeout=60, allow_redirects=True)
-    r.raise_for_status()
-    return r.content
+    if max_bytes and (file_obj.get("size") or 0) > max_bytes:
+        raise RuntimeError(f"File is {file_obj['size']} bytes; limit is {max_bytes}")
+
+    r = _canvas_request(url, timeout=60, allow_redirects=True, stream=True)
+    try:
+        r.raise_for_status()
+        written = 0
+        for chunk in r.iter_content(chunk_size=_DOWNLOAD_CHUNK):
+            if written == 0 and magic and magic not in chunk[:1024]:
+                raise RuntimeError("Not a PDF (bad magic bytes)")
+            written += len(chunk)
+            if max_bytes and written > max_bytes:
+                raise RuntimeError(f"Download exceeded {max_bytes} bytes")
+            dest.write(chunk)
+        return written
+    finally:
+        r.close()
+
+def _download_pdf_to_tempfile(file_obj: dict) -> str:
+    """Stream a candidate PDF to a temp file (capped at PDF_MAX_BYTES) and return its path."""
+    fd, path = tempfile.mkstemp(suffix=".pdf", prefix="canvas-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            _download_canvas_file(file_obj, out, max_bytes=PDF_MAX_BYTES, magic=b"%PDF-")
+    except BaseException:
+        _remove_quietly(path)
+        raise
+    return path
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass  # e.g. still open by a timed-out worker on Windows
+
+# PDF text extraction runs in a process pool so one pathological file can't
+# stall a scan, and multi-course scans use every core.
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES") or 50)
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS") or 30)
+PDF_MEMORY_MB = int(os.getenv("PDF_MEMORY_MB") or 512)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS") or os.cpu_count() or 2)
+_PDF_POOL: ProcessPoolExecutor | None = None
+_PDF_POOL_LOCK = threading.Lock()
+
+def _pdf_worker_init(memory_mb: int) -> None:
+    # Address-space cap where the platform supports it (not on Windows)
+    try:
+        import resource
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+def _pdf_timeout(signum, frame):
+    raise TimeoutError("PDF extraction timed out")
+
+def _extract_pdf_text(path: str, max_pages: int, timeout: float) -> str:
+    """Runs in a pool worker: pdfminer text of the first `max_pages` pages of the file at `path`."""
+    from pdfminer.high_level import extract_text
+
+    # Enforce the per-file wall clock inside the worker where SIGALRM exists
+    use_alarm = hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _pdf_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        # pdfminer seeks within the file itself; nothing is buffered up front
+        return extract_text(path, maxpages=max_pages) or ""
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+def _pdf_mp_context():
+    # Workers must not be forked from this (threaded) process: a fork inherits
+    # every thread's stack and malloc arena, which alone can exceed the
+    # RLIMIT_AS cap, and can deadlock on locks held by other threads
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+def _pdf_pool() -> ProcessPoolExecutor:
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS, mp_context=_pdf_mp_context(),
+                initializer=_pdf_worker_init, initargs=(PDF_MEMORY_MB,)
+            )
+        return _PDF_POOL
+
+def _reset_pdf_pool() -> None:
+    """Drop a pool whose worker died (e.g. hit the memory cap) so the next scan gets a fresh one."""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is not None:
+            _PDF_POOL.shutdown(wait=False, cancel_futures=True)
+            _PDF_POOL = None
+
+class _SyllabusCache:
+    """
+    On-disk cache of extracted syllabus PDF text keyed by Canvas file id +
+    modified_at + size, so a repeat scan skips both download and pdfminer.
+    Parsed events are kept too, reused only for the same course name and day
+    (date parsing prefers future dates, so results depend on "today").
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _path(self, file_obj: dict) -> Path | None:
+        if not self.enabled or not file_obj.get("id"):
+            return None
+        stamp = file_obj.get("modified_at") or file_obj.get("updated_at") or ""
+        raw = f"{file_obj['id']}:{stamp}:{file_obj.get('size', '')}"
+        return self.directory / f"{hashlib.sha256(raw.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, file_obj: dict) -> dict | None:
+        path = self._path(file_obj)
+        entry = None
+        if path is not None:
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+                os.utime(path)  # bump LRU position
+            except (OSError, ValueError):
+                entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def put(self, file_obj: dict, text: str, course_name: str, events: list[dict]) -> None:
+        path = self._path(file_obj)
+        if path is None:
+            return
+        entry = {
+            "text": text,
+            "course_name": course_name,
+            "parsed_on": datetime.now().date().isoformat(),
+            "events": events,
+        }
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(entry), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            self.evictions += _evict_lru(self.directory, self.max_bytes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+SYLLABUS_CACHE_DIR = Path(os.getenv("SYLLABUS_CACHE_DIR") or Path(__file__).with_name(".syllabus_cache"))
+SYLLABUS_CACHE_MAX_BYTES = int(os.getenv("SYLLABUS_CACHE_MAX_BYTES") or 20 * 1024 * 1024)
+_SYLLABUS_CACHE = _SyllabusCache(
+    SYLLABUS_CACHE_DIR,
+    SYLLABUS_CACHE_MAX_BYTES,
+    enabled=(os.getenv("SYLLABUS_CACHE") or "1") != "0",
+)
+
+def _cached_syllabus_events(entry: dict, course_name: str) -> list[dict]:
+    if entry.get("course_name") == course_name and entry.get("parsed_on") == datetime.now().date().isoformat():
+        return entry.get("events") or []
+    return _extract_dates_from_text(entry.get("text") or "", course_name)
 
 EXAM_KEYWORDS = re.compile(r"\b(final|midterm|exam|quiz|test)\b", re.I)
 
@@ -123,52 +604,159 @@ def _normalize_text(s: str) -> str:
     return s.replace("–", "-").replace("—", "-").translate(_NORMALIZE_DROP)
 
 # Helpful regexes
+# Full month names and their usual abbreviations only, so words that merely
+# start like a month ("marked 10", "decided 3") are not read as dates
+_MONTHS = {name: i for i, names in enumerate((
+    ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+    ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+    ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december"),
+), start=1) for name in names}
+_MONTH_RE = "|".join(sorted(_MONTHS, key=len, reverse=True))
 DATE_HINT_RE = re.compile(
-    r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2}(?:,\s*\d{4})?",
+    rf"\b(?:{_MONTH_RE})\b\.?\s+\d{{1,2}}(?!\d)(?:,\s*\d{{4}})?",
     re.I,
 )
 TIME_RANGE_RE = re.compile(
-    r"(\d{1,2}(?::\d{2})?\s*(?:am|pm))\s*[-–—]\s*(\d{1,2}(?::\d{2})?\s*(?:am|pm))",
+    # start meridiem is optional ("2-5pm"); it is inherited from the end time
+    r"\b(\d{1,2}(?::\d{2})?\s*(?:am|pm)?)\s*[-–—]\s*(\d{1,2}(?::\d{2})?\s*(?:am|pm))",
     re.I,
 )
-def _extract_dates_from_text(text: str, course_name: str) -> list[dict]:
+
+# Fast path for the shapes DATE_HINT_RE / TIME_RANGE_RE match; dateparser is
+# only a (memoized) fallback for anything these don't cover.
+_DATE_PARTS_RE = re.compile(rf"({_MONTH_RE})\.?\s+(\d{{1,2}})(?:,\s*(\d{{4}}))?", re.I)
+_TIME_PARTS_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?", re.I)
+
+@lru_cache(maxsize=4096)
+def _dateparser_parse(s: str, reference: datetime) -> datetime | None:
+    import dateparser
+
+    return dateparser.parse(s, settings={"PREFER_DATES_FROM": "future", "RELATIVE_BASE": reference})
+
+def _fast_parse_date(hint: str, reference: datetime) -> datetime | None:
+    """'Dec 11' / 'Dec. 11, 2025' -> midnight datetime; year-less dates roll forward past `reference`."""
+    m = _DATE_PARTS_RE.fullmatch(hint.strip())
+    if not m:
+        return None
+    month = _MONTHS.get(m.group(1).lower())
+    if not month:
+        return None
+    day = int(m.group(2))
+    try:
+        if m.group(3):
+            return datetime(int(m.group(3)), month, day)
+        dt = datetime(reference.year, month, day)
+        return dt if dt.date() >= reference.date() else datetime(reference.year + 1, month, day)
+    except ValueError:
+        return None
+
+def _fast_parse_time(t: str, default_meridiem: str | None = None) -> tuple[int, int] | None:
+    m = _TIME_PARTS_RE.fullmatch(t.strip())
+    if not m:
+        return None
+    hour, minute = int(m.group(1)), int(m.group(2) or 0)
+    meridiem = (m.group(3) or default_meridiem or "").lower()
+    if not meridiem or not 1 <= hour <= 12 or minute > 59:
+        return None
+    if meridiem == "pm" and hour != 12:
+        hour += 12
+    elif meridiem == "am" and hour == 12:
+        hour = 0
+    return hour, minute
+
+def _parse_date_hint(hint: str, reference: datetime) -> datetime | None:
+    return _fast_parse_date(hint, reference) or _dateparser_parse(hint, reference)
+
+def _parse_time_range(day: datetime, hint: str, start: str, end: str,
+                      reference: datetime) -> tuple[datetime | None, datetime | None]:
+    end_hm = _fast_parse_time(end)
+    end_meridiem = end.strip()[-2:].lower()
+    start_hm = _fast_parse_time(start, default_meridiem=end_meridiem)
+    if start_hm and end_hm:
+        if not re.search(r"(am|pm)\s*$", start, re.I) and start_hm > end_hm:
+            start_hm = _fast_parse_time(start, default_meridiem="am")  # "11-1pm"
+        return (day.replace(hour=start_hm[0], minute=start_hm[1]),
+                day.replace(hour=end_hm[0], minute=end_hm[1]))
+    if not re.search(r"(am|pm)\s*$", start, re.I):
+        start = f"{start}{end_meridiem}"
+    return (_dateparser_parse(f"{hint} {start}", reference),
+            _dateparser_parse(f"{hint} {end}", reference))
+
+def _extract_dates_from_text(text: str, course_name: str,
+                             reference: datetime | None = None) -> list[dict]:
     """
     Heuristic:
       â€¢ scan 3-line windows so 'Final Exam' and 'Dec 11, 2â€“5pm' can be on adjacent lines
       â€¢ normalize PDF artifacts
       â€¢ parse date and optional time range
+    Year-less dates resolve relative to `reference` (default: today at
+    midnight), which keeps results deterministic and the parse cache warm.
+
+    Each regex runs once over the whole text; a window's first keyword /
+    date / time-range hit is then found by advancing a pointer, so long
+    schedules stay linear. Overlapping windows that land on the same exam
+    are emitted once.
     """
+    if reference is None:
+        reference = datetime.combine(datetime.now().date(), datetime.min.time())
+
     text = _normalize_text(text)
     lines = text.splitlines()
     out: list[dict] = []
+    seen: set[tuple[str, str, str]] = set()
+
+    # Windows are " ".join(lines[i:i+3]), i.e. slices of one joined string
+    joined = " ".join(lines)
+    starts: list[int] = []
+    pos = 0
+    for line in lines:
+        starts.append(pos)
+        pos += len(line) + 1
+
+    hits = [list(rx.finditer(joined)) for rx in (EXAM_KEYWORDS, DATE_HINT_RE, TIME_RANGE_RE)]
+    ptrs = [0, 0, 0]
+
+    def first_hit(k: int, lo: int, hi: int) -> re.Match | None:
+        # Matches are sorted and non-overlapping: skip those before the window,
+        # and if the next one doesn't end inside it, none later will either
+        ms = hits[k]
+        while ptrs[k] < len(ms) and ms[ptrs[k]].start() < lo:
+            ptrs[k] += 1
+        j = ptrs[k]
+        return ms[j] if j < len(ms) and ms[j].end() <= hi else None
 
     for i in range(len(lines)):
-        window = " ".join(lines[i:i+3])  # current line + next 2 lines
-        if not EXAM_KEYWORDS.search(window):
+        lo = starts[i]
+        hi = starts[min(i + 2, len(lines) - 1)] + len(lines[min(i + 2, len(lines) - 1)])
+        mkw = first_hit(0, lo, hi)
+        if not mkw:
             continue
+        window = joined[lo:hi]  # current line + next 2 lines
 
         # date
-        mdate = DATE_HINT_RE.search(window)
-        dt = dateparser.parse(mdate.group(0), settings={"PREFER_DATES_FROM": "future"}) if mdate \
-             else dateparser.parse(window, settings={"PREFER_DATES_FROM": "future"})
+        mdate = first_hit(1, lo, hi)
+        dt = _parse_date_hint(mdate.group(0), reference) if mdate \
+             else _dateparser_parse(window, reference)
         if not dt:
             continue
 
         # optional time range
-        mtime = TIME_RANGE_RE.search(window)
+        mtime = first_hit(2, lo, hi)
+        dt_start = dt_end = None
         if mtime and mdate:
-            dt_start = dateparser.parse(f"{mdate.group(0)} {mtime.group(1)}",
-                                        settings={"PREFER_DATES_FROM": "future"})
-            dt_end   = dateparser.parse(f"{mdate.group(0)} {mtime.group(2)}",
-                                        settings={"PREFER_DATES_FROM": "future"})
-        else:
+            dt_start, dt_end = _parse_time_range(dt, mdate.group(0), mtime.group(1), mtime.group(2), reference)
+        if not dt_start or not dt_end:
             dt_start = dt.replace(hour=9, minute=0, second=0, microsecond=0)
             dt_end   = dt_start.replace(hour=10)
 
-        mkw = EXAM_KEYWORDS.search(window)
-        label = mkw.group(1).title() if mkw else "Exam"
+        label = mkw.group(1).title()
         name = f"{label} Exam" if label.lower() in ("midterm", "final") else label
 
+        key = (name, dt_start.isoformat(), dt_end.isoformat())
+        if key in seen:
+            continue
+        seen.add(key)
+
         out.append({
             "type": "event",
             "name": name,
@@ -192,15 +780,20 @@ Prerequisites:
 """
 
 import asyncio
+import contextlib
 import os
 import json
-from datetime import datetime
-from typing import List, Dict, Any
+import base64
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Iterator, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit
 import requests
 from dateutil import parser as date_parser
 
 from mcp.server import Server
-from mcp.types import Tool, Resource, TextContent
+from mcp.types import Tool, Resource, ResourceTemplate, TextContent
 
 # Initialize MCP Server
 server = Server("canvas-outlook-sync")
@@ -210,19 +803,60 @@ OUTLOOK_CLIENT_ID = os.getenv("OUTLOOK_CLIENT_ID", "")
 OUTLOOK_CLIENT_SECRET = os.getenv("OUTLOOK_CLIENT_SECRET", "")
 OUTLOOK_TENANT_ID = os.getenv("OUTLOOK_TENANT_ID", "common")
 
-# In-memory storage for session data
-session_data = {
-    "courses": [],
-    "assignments": [],
-    "outlook_token": None
+# Candidate PDF ranking: name keywords add, lecture-material words subtract,
+# recent files get a bonus and big files a log-scaled penalty
+SYLLABUS_KEYWORD_WEIGHTS = {
+    "syllabus": 10, "schedule": 8, "calendar": 6, "exam": 5, "midterm": 5,
+    "outline": 4, "final": 3,
+}
+SYLLABUS_PENALTY_WEIGHTS = {
+    "review": 4, "lecture": 4, "slides": 4, "solution": 3, "practice": 2,
+    "homework": 2, "notes": 2,
 }
+SYLLABUS_MAX_FILES = int(os.getenv("SYLLABUS_MAX_FILES") or 5)
+SYLLABUS_BYTE_BUDGET = int(os.getenv("SYLLABUS_BYTE_BUDGET") or 20 * 1024 * 1024)
+SYLLABUS_TIME_BUDGET = float(os.getenv("SYLLABUS_TIME_BUDGET") or 60)
+SYLLABUS_STOP_ON_FOUND = os.getenv("SYLLABUS_STOP_ON_FOUND", "1") != "0"
+
+# course_id -> what the last scan of that course read or skipped, and why
+_SYLLABUS_SCAN_STATS: dict[int, dict] = {}
+
+def _score_syllabus_candidate(file_obj: dict, now: float) -> float | None:
+    """Rank a course file as a syllabus source; None when no keyword matches at all."""
+    name = (file_obj.get("display_name", "") + " " + file_obj.get("filename", "")).lower()
+    score = sum(w for k, w in SYLLABUS_KEYWORD_WEIGHTS.items() if k in name)
+    if not score:
+        return None
+    score -= sum(w for k, w in SYLLABUS_PENALTY_WEIGHTS.items() if k in name)
+
+    stamp = file_obj.get("modified_at") or file_obj.get("updated_at") or file_obj.get("created_at")
+    if stamp:
+        try:
+            age_days = (now - datetime.fromisoformat(stamp.replace("Z", "+00:00")).timestamp()) / 86400
+            score += 3 * max(0.0, 1 - age_days / 365)
+        except ValueError:
+            pass
+
+    size_mb = (file_obj.get("size") or 0) / (1024 * 1024)
+    if size_mb > 1:
+        score -= math.log2(size_mb)
+    return score
+
+def syllabus_scan_stats() -> dict[int, dict]:
+    """Per-course stats from the most recent scan_syllabus_for_dates calls."""
+    return dict(_SYLLABUS_SCAN_STATS)
 
 def scan_syllabus_for_dates(course_id: int) -> list[dict]:
     """
     Returns exam-like events found in:
       1) syllabus HTML (syllabus_body)
-      2) relevant PDF(s) in course files (names containing common keywords)
+      2) relevant PDF(s) in course files, ranked by _score_syllabus_candidate
+         and read within SYLLABUS_MAX_FILES / SYLLABUS_BYTE_BUDGET /
+         SYLLABUS_TIME_BUDGET, stopping once exam dates turn up
+    What was scanned or skipped is recorded in syllabus_scan_stats().
     """
+    from bs4 import BeautifulSoup
+
     results: list[dict] = []
     course = _canvas_get_course(course_id)
     cname = course.get("name", f"Course {course_id}")
@@ -233,34 +867,126 @@ def scan_syllabus_for_dates(course_id: int) -> list[dict]:
         text = BeautifulSoup(html, "html.parser").get_text(separator="\n")
         results.extend(_extract_dates_from_text(text, cname))
 
-    # 2) Candidate PDFs (broader than just â€œsyllabusâ€)
-    CANDIDATES = ("syllabus", "schedule", "exam", "midterm", "final", "outline", "calendar")
+    # 2) Candidate PDFs (broader than just â€œsyllabusâ€), best-ranked first
     try:
-        files = _canvas_list_files(course_id)
+        files = _canvas_list_files(course_id, content_types=("application/pdf",))
     except Exception:
         files = []
-    pdfs = []
-    for f in files:
-        if f.get("content-type") != "application/pdf":
+    now = time.time()
+    scored = ((f, _score_syllabus_candidate(f, now)) for f in files
+              if f.get("content-type") == "application/pdf")
+    ranked = sorted(((f, score) for f, score in scored if score is not None),
+                    key=lambda fs: fs[1], reverse=True)
+
+    def pdf_error(f: dict, detail: str) -> dict:
+        # Do not fail the whole scan on one bad PDF
+        return {
+            "type": "error",
+            "name": f"PDF parse failed: {f.get('display_name') or f.get('filename')}",
+            "description": detail,
+        }
+
+    stats = {"candidates": len(ranked), "scanned": [], "skipped": [], "bytes": 0,
+             "seconds": 0.0, "stopped": None}
+
+    def note(bucket: str, f: dict, score: float, reason: str) -> None:
+        stats[bucket].append({"file": f.get("display_name") or f.get("filename"),
+                              "score": round(score, 2), "reason": reason})
+
+    started = time.monotonic()
+    deadline = started + SYLLABUS_TIME_BUDGET
+    found = SYLLABUS_STOP_ON_FOUND and any(r.get("type") == "event" for r in results)
+    per_file: dict[int, list[dict]] = {}
+    queue = list(enumerate(ranked))
+    pool = None
+    while queue:
+        # Fill a wave of at most PDF_WORKERS downloads; cache hits cost nothing
+        wave: list[int] = []
+        while queue and len(wave) < PDF_WORKERS and not found:
+            i, (f, score) = queue.pop(0)
+            size = f.get("size") or 0
+            if score <= 0:
+                note("skipped", f, score, "low score")
+            elif len(stats["scanned"]) + len(wave) >= SYLLABUS_MAX_FILES:
+                note("skipped", f, score, "file limit")
+            elif time.monotonic() >= deadline:
+                note("skipped", f, score, "time budget")
+            elif (cached := _SYLLABUS_CACHE.get(f)) is not None:
+                per_file[i] = _cached_syllabus_events(cached, cname)
+                note("scanned", f, score, "cache")
+                found = SYLLABUS_STOP_ON_FOUND and bool(per_file[i])
+            elif stats["bytes"] + size > SYLLABUS_BYTE_BUDGET:
+                note("skipped", f, score, "byte budget")
+            else:
+                stats["bytes"] += size
+                wave.append(i)
+        if found:
+            stats["stopped"] = "exam dates found"
+            for _, (f, score) in queue:
+                note("skipped", f, score, "exam dates found")
+            queue = []
+        if not wave:
             continue
-        name = (f.get("display_name","") + " " + f.get("filename","")).lower()
-        if any(k in name for k in CANDIDATES):
-            pdfs.append(f)
-    pdfs = pdfs[:5]  # safety limit
 
-    for f in pdfs:
-        try:
-            content = _download_canvas_file(f)
-            text = extract_text(BytesIO(content)) or ""
-            results.extend(_extract_dates_from_text(text, cname))
-        except Exception as e:
-            # Do not fail the whole scan on one bad PDF
-            results.append({
-                "type": "error",
-                "name": f"PDF parse failed: {f.get('display_name') or f.get('filename')}",
-                "description": str(e),
-            })
+        # Download in this thread while earlier files are already being parsed
+        pool = pool or _pdf_pool()
+        futures = {}
+        temp_paths: list[str] = []
+        for i in wave:
+            f, score = ranked[i]
+            note("scanned", f, score, "download")
+            try:
+                path = _download_pdf_to_tempfile(f)
+                temp_paths.append(path)
+                args = (_extract_pdf_text, path, PDF_MAX_PAGES, PDF_TIMEOUT_SECONDS)
+                try:
+                    fut = pool.submit(*args)
+                except BrokenProcessPool:
+                    _reset_pdf_pool()
+                    pool = _pdf_pool()
+                    fut = pool.submit(*args)
+                futures[fut] = i
+            except Exception as e:
+                per_file[i] = [pdf_error(f, str(e))]
 
+        try:
+            # Backstop for platforms without SIGALRM: every file gets its slot plus
+            # slack, but never past the course's time budget
+            backstop = PDF_TIMEOUT_SECONDS * math.ceil(max(1, len(futures)) / PDF_WORKERS) + 5
+            try:
+                for fut in as_completed(futures, timeout=min(backstop, max(0.0, deadline - time.monotonic()))):
+                    i = futures[fut]
+                    f = ranked[i][0]
+                    try:
+                        text = fut.result()
+                        per_file[i] = _extract_dates_from_text(text, cname)
+                        _SYLLABUS_CACHE.put(f, text, cname, per_file[i])
+                        found = found or (SYLLABUS_STOP_ON_FOUND and bool(per_file[i]))
+                    except BrokenProcessPool as e:
+                        _reset_pdf_pool()
+                        pool = None
+                        per_file[i] = [pdf_error(f, f"worker crashed (memory cap {PDF_MEMORY_MB} MB?): {e}")]
+                    except TimeoutError:
+                        per_file[i] = [pdf_error(f, f"timed out after {PDF_TIMEOUT_SECONDS:g}s")]
+                    except Exception as e:
+                        per_file[i] = [pdf_error(f, str(e))]
+            except FuturesTimeoutError:
+                over_budget = time.monotonic() >= deadline
+                for fut, i in futures.items():
+                    if i not in per_file:
+                        fut.cancel()
+                        detail = (f"scan time budget ({SYLLABUS_TIME_BUDGET:g}s) exhausted" if over_budget
+                                  else f"timed out after {PDF_TIMEOUT_SECONDS:g}s")
+                        per_file[i] = [pdf_error(ranked[i][0], detail)]
+        finally:
+            for path in temp_paths:
+                _remove_quietly(path)
+
+    for i in sorted(per_file):
+        results.extend(per_file[i])
+
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    _SYLLABUS_SCAN_STATS[course_id] = stats
     return results
 
 # ============================================================================
@@ -274,7 +1000,7 @@ def canvas_request(endpoint: str) -> Dict[str, Any]:
 def get_all_courses() -> List[Dict[str, Any]]:
     """Fetch all active courses"""
     try:
-        courses = canvas_request("courses?enrollment_state=active")
+        courses = _canvas_paginate("courses", {"enrollment_state": "active"})
         return [
             {
                 "id": course["id"],
@@ -288,170 +1014,1144 @@ def get_all_courses() -> List[Dict[str, Any]]:
         return [{"error": str(e)}]
 
 
-def get_course_assignments(course_id: int) -> List[Dict[str, Any]]:
+# Large fields we never read; Canvas leaves them out of the response
+ASSIGNMENT_EXCLUDE_FIELDS = ("description", "rubric")
+# Values Canvas accepts for the assignments `bucket` filter
+ASSIGNMENT_BUCKETS = ("past", "overdue", "undated", "ungraded", "unsubmitted", "upcoming", "future")
+
+
+def iter_course_assignments(
+    course_id: int,
+    bucket: str | None = None,
+    slim: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream dated assignments for a course, one Canvas page at a time.
+    slim=True asks Canvas to drop ASSIGNMENT_EXCLUDE_FIELDS; bucket (e.g.
+    "upcoming") narrows the list server-side.
+    """
+    params: dict = {}
+    if slim:
+        params["exclude_response_fields[]"] = list(ASSIGNMENT_EXCLUDE_FIELDS)
+    if bucket:
+        if bucket not in ASSIGNMENT_BUCKETS:
+            raise ValueError(f"Unknown assignment bucket: {bucket}")
+        params["bucket"] = bucket
+    for assignment in _canvas_paginate(f"courses/{course_id}/assignments", params):
+        due_date = assignment.get("due_at")
+        if due_date:
+            yield {
+                "course_id": course_id,
+                "id": assignment["id"],
+                "name": assignment["name"],
+                "due_date": due_date,
+                "points": assignment.get("points_possible", 0),
+                "updated_at": assignment.get("updated_at"),
+                "type": "assignment"
+            }
+
+
+def get_course_assignments(course_id: int, bucket: str | None = None) -> List[Dict[str, Any]]:
     """Fetch assignments for a specific course"""
     try:
-        assignments = canvas_request(f"courses/{course_id}/assignments")
-        parsed_assignments = []
-        
-        for assignment in assignments:
-            due_date = assignment.get("due_at")
-            if due_date:
-                parsed_assignments.append({
-                    "course_id": course_id,
-                    "id": assignment["id"],
-                    "name": assignment["name"],
-                    "due_date": due_date,
-                    "points": assignment.get("points_possible", 0),
-                    "type": "assignment"
-                })
-        
-        return parsed_assignments
+        return list(iter_course_assignments(course_id, bucket=bucket))
     except Exception as e:
         return [{"error": str(e)}]
 
 
-def get_course_calendar_events(course_id: int) -> List[Dict[str, Any]]:
+def _parse_calendar_event(event: Dict[str, Any], course_id: int) -> Dict[str, Any] | None:
+    start_date = event.get("start_at")
+    if not start_date:
+        return None
+    return {
+        "course_id": course_id,
+        "id": event["id"],
+        "name": event["title"],
+        "start_date": start_date,
+        "end_date": event.get("end_at", start_date),
+        "description": event.get("description", ""),
+        "updated_at": event.get("updated_at"),
+        "type": "event"
+    }
+
+
+def iter_course_calendar_events(
+    course_id: int,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream calendar events for a course, one Canvas page at a time.
+    start_date/end_date bound the window server-side; Canvas would otherwise
+    return only today's events, so they default to sync_window().
+    """
+    start_date, end_date = sync_window(start_date, end_date)
+    params = {"context_codes[]": f"course_{course_id}", "type": "event",
+              "excludes[]": ["child_events"], "start_date": start_date, "end_date": end_date}
+    for event in _canvas_paginate("calendar_events", params):
+        item = _parse_calendar_event(event, course_id)
+        if item:
+            yield item
+
+
+def get_course_calendar_events(
+    course_id: int,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> List[Dict[str, Any]]:
     """Fetch calendar events (including exams) for a course"""
     try:
-        events = canvas_request(
-            f"calendar_events?context_codes[]=course_{course_id}&type=event"
-        )
-        parsed_events = []
-        
-        for event in events:
-            start_date = event.get("start_at")
-            if start_date:
-                parsed_events.append({
-                    "course_id": course_id,
-                    "id": event["id"],
-                    "name": event["title"],
-                    "start_date": start_date,
-                    "end_date": event.get("end_at", start_date),
-                    "description": event.get("description", ""),
-                    "type": "event"
-                })
-        
-        return parsed_events
+        return list(iter_course_calendar_events(course_id, start_date, end_date))
     except Exception as e:
         return [{"error": str(e)}]
 
 
+# ============================================================================
+# Tool progress & cancellation
+# ============================================================================
+
+class ToolCancelled(Exception):
+    """Raised inside tool work when the MCP client cancelled the request."""
+
+
+# Set by call_tool for the worker thread running a tool; unset for plain imports
+_TOOL_PROGRESS: contextvars.ContextVar[Callable[[str], None] | None] = \
+    contextvars.ContextVar("tool_progress", default=None)
+_TOOL_CANCEL: contextvars.ContextVar[threading.Event | None] = \
+    contextvars.ContextVar("tool_cancel", default=None)
+
+
+def _report_progress(message: str) -> None:
+    report = _TOOL_PROGRESS.get()
+    if report is not None:
+        report(message)
+
+
+def _check_cancelled() -> None:
+    cancel = _TOOL_CANCEL.get()
+    if cancel is not None and cancel.is_set():
+        raise ToolCancelled()
+
+
+# ============================================================================
+# Concurrent per-course fetch
+# ============================================================================
+
+CANVAS_CONCURRENCY = int(os.getenv("CANVAS_CONCURRENCY") or 8)
+
+
+def fetch_courses_concurrently(
+    courses: List[Dict[str, Any]],
+    fetchers: List[Callable[[int], List[Dict[str, Any]]]],
+    concurrency: int | None = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Run every fetcher for every course on a bounded thread pool.
+    Returns one item list per course (same order as `courses`), with each
+    course's results concatenated in `fetchers` order. A failing call only
+    drops that call's items; the rest of the course and term are kept.
+    """
+    workers = max(1, concurrency or CANVAS_CONCURRENCY)
+
+    def run(fetch, cid):
+        try:
+            return fetch(cid) or []
+        except Exception:
+            return []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            [pool.submit(run, fetch, c["id"]) for fetch in fetchers]
+            for c in courses
+        ]
+        out = []
+        try:
+            for c, course_futs in zip(courses, futures):
+                out.append([item for fut in course_futs for item in fut.result()])
+                _report_progress(f"Fetched {c.get('name', c['id'])} ({len(out)}/{len(courses)})")
+                _check_cancelled()
+        except ToolCancelled:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        return out
+
+
+# ============================================================================
+# Bulk multi-course calendar fetch
+# ============================================================================
+
+# Canvas caps context_codes[] per calendar_events request (10 by default)
+CANVAS_CONTEXT_CODES_LIMIT = int(os.getenv("CANVAS_CONTEXT_CODES_LIMIT") or 10)
+
+
+def _parse_assignment_event(event: Dict[str, Any], course_id: int) -> Dict[str, Any] | None:
+    """Map a type=assignment calendar entry onto the get_course_assignments shape."""
+    assignment = event.get("assignment") or {}
+    due_date = assignment.get("due_at") or event.get("start_at")
+    if not due_date:
+        return None
+    return {
+        "course_id": course_id,
+        "id": assignment.get("id") or event["id"],
+        "name": assignment.get("name") or event["title"],
+        "due_date": due_date,
+        "points": assignment.get("points_possible", 0),
+        "updated_at": assignment.get("updated_at") or event.get("updated_at"),
+        "type": "assignment"
+    }
+
+
+# Assignment entries only need the nested assignment's dates, not the HTML body
+_BULK_EXCLUDES = {"assignment": ["description", "child_events"], "event": ["child_events"]}
+
+
+def get_calendar_items_bulk(
+    course_ids: List[int],
+    include_assignments: bool = True,
+    concurrency: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Fetch events (and assignment due dates) for many courses with a few
+    multi-context calendar_events requests instead of one per course.
+    Returns {course_id: [assignments..., events...]}; a failed chunk yields an
+    error item for each of its courses, like get_course_* do.
+    start_date/end_date bound the window server-side; Canvas would otherwise
+    return only today's entries, so they default to sync_window().
+    """
+    start_date, end_date = sync_window(start_date, end_date)
+    kinds = ["assignment", "event"] if include_assignments else ["event"]
+    parsers = {"assignment": _parse_assignment_event, "event": _parse_calendar_event}
+    size = max(1, CANVAS_CONTEXT_CODES_LIMIT)
+    chunks = [course_ids[i:i + size] for i in range(0, len(course_ids), size)]
+
+    def run(kind, chunk):
+        params = {"context_codes[]": [f"course_{cid}" for cid in chunk], "type": kind,
+                  "excludes[]": _BULK_EXCLUDES[kind], "start_date": start_date, "end_date": end_date}
+        by_course: Dict[int, List[Dict[str, Any]]] = {cid: [] for cid in chunk}
+        try:
+            for raw in _canvas_paginate("calendar_events", params):
+                code = raw.get("context_code") or ""
+                cid = int(code.split("_", 1)[1]) if code.startswith("course_") else None
+                if cid not in by_course:
+                    continue
+                item = parsers[kind](raw, cid)
+                if item:
+                    by_course[cid].append(item)
+        except Exception as e:
+            by_course = {cid: [{"error": str(e)}] for cid in chunk}
+        return by_course
+
+    out: Dict[int, List[Dict[str, Any]]] = {cid: [] for cid in course_ids}
+    workers = max(1, concurrency or CANVAS_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run, kind, chunk) for kind in kinds for chunk in chunks]
+        for fut in futures:
+            for cid, items in fut.result().items():
+                out[cid].extend(items)
+    return out
+
+
+# ============================================================================
+# Planner API backend
+# ============================================================================
+
+SYNC_HORIZON_DAYS = int(os.getenv("SYNC_HORIZON_DAYS") or 180)
+PLANNER_LOOKBACK_DAYS = int(os.getenv("PLANNER_LOOKBACK_DAYS") or 30)
+_PLANNER_ASSIGNMENT_TYPES = ("assignment", "quiz", "discussion_topic")
+
+
+def _parse_planner_item(entry: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Normalize a planner item into the same dict shape as the per-course fetchers."""
+    kind = entry.get("plannable_type")
+    plannable = entry.get("plannable") or {}
+    course_id = entry.get("course_id")
+    if course_id is None:
+        return None  # personal notes / user-level items
+
+    if kind in _PLANNER_ASSIGNMENT_TYPES:
+        due_date = plannable.get("due_at") or entry.get("plannable_date")
+        if not due_date:
+            return None
+        return {
+            "course_id": course_id,
+            # quizzes/discussions carry the backing assignment id, which keeps
+            # canvas_key identical to the per-course path
+            "id": plannable.get("assignment_id") or entry.get("plannable_id"),
+            "name": plannable.get("title", ""),
+            "due_date": due_date,
+            "points": plannable.get("points_possible", 0),
+            "updated_at": plannable.get("updated_at"),
+            "course_name": entry.get("context_name", ""),
+            "type": "assignment"
+        }
+    if kind == "calendar_event":
+        start_date = plannable.get("start_at") or entry.get("plannable_date")
+        if not start_date:
+            return None
+        return {
+            "course_id": course_id,
+            "id": entry.get("plannable_id"),
+            "name": plannable.get("title", ""),
+            "start_date": start_date,
+            "end_date": plannable.get("end_at") or start_date,
+            "description": plannable.get("description", ""),
+            "updated_at": plannable.get("updated_at"),
+            "course_name": entry.get("context_name", ""),
+            "type": "event"
+        }
+    return None
+
+
+def sync_window(start_date: str | None = None, end_date: str | None = None) -> Tuple[str, str]:
+    """(start, end) ISO dates, defaulting to PLANNER_LOOKBACK_DAYS back through SYNC_HORIZON_DAYS ahead."""
+    today = datetime.now().date()
+    return (start_date or (today - timedelta(days=PLANNER_LOOKBACK_DAYS)).isoformat(),
+            end_date or (today + timedelta(days=SYNC_HORIZON_DAYS)).isoformat())
+
+
+def list_planner_items(
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    All assignments, quizzes, discussions and calendar events across courses
+    from /planner/items, in one paginated stream. The window defaults to
+    PLANNER_LOOKBACK_DAYS back through SYNC_HORIZON_DAYS ahead.
+    """
+    start_date, end_date = sync_window(start_date, end_date)
+    params = {"start_date": start_date, "end_date": end_date}
+    items = []
+    for entry in _canvas_paginate("planner/items", params):
+        item = _parse_planner_item(entry)
+        if item:
+            items.append(item)
+    return items
+
+
+# ============================================================================
+# Incremental sync (updated_at watermarks)
+# ============================================================================
+
+SYNC_STATE_PATH = Path(os.getenv("CANVAS_SYNC_STATE") or Path(__file__).with_name(".canvas_sync_state.json"))
+_SYNC_STATE_LOCK = threading.Lock()
+# One sync per target at a time: tool calls run concurrently on worker
+# threads, and two overlapping reconcile -> upsert -> watermark runs would
+# both insert the same new keys (duplicate events) and clobber each other's index
+_SYNC_TARGET_LOCKS: Dict[str, threading.Lock] = {}
+
+
+@contextlib.contextmanager
+def sync_target_lock(target: str) -> Iterator[None]:
+    """Hold the lock for `target` ("outlook", "google:<calendar>"); waiting stays cancellable."""
+    with _SYNC_STATE_LOCK:
+        lock = _SYNC_TARGET_LOCKS.setdefault(target, threading.Lock())
+    while not lock.acquire(timeout=0.5):
+        _check_cancelled()
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def _load_sync_state() -> Dict[str, Any]:
+    try:
+        return json.loads(SYNC_STATE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_sync_state(state: Dict[str, Any]) -> None:
+    tmp = SYNC_STATE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, SYNC_STATE_PATH)
+
+
+def _watermark_key(item: Dict[str, Any]) -> str:
+    return f"{item.get('course_id')}:{item.get('type', 'item')}"
+
+
+def _parse_updated_at(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return date_parser.isoparse(value)
+    except (ValueError, OverflowError):
+        return None
+
+
+def filter_changed_items(
+    items: List[Dict[str, Any]],
+    target: str,
+    index: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """
+    Drop items `target` ("google:<calendar>" / "outlook") already has: their
+    canvas_key is in the target's (freshly reconciled) index and their
+    Canvas updated_at is at or below the per-course watermark. Keys the
+    index doesn't know are always kept, since a windowed or bucketed fetch
+    can move the watermark past items that were never sent. Items without
+    updated_at (e.g. syllabus-derived) are always treated as changed.
+    """
+    marks = _load_sync_state().get("watermarks", {}).get(target, {})
+    changed = []
+    for it in items:
+        if "error" in it:
+            continue
+        updated = _parse_updated_at(it.get("updated_at"))
+        mark = _parse_updated_at(marks.get(_watermark_key(it)))
+        if _canvas_key(it) not in index or updated is None or mark is None or updated > mark:
+            changed.append(it)
+    return changed
+
+
+def advance_watermarks(
+    synced: List[Dict[str, Any]],
+    failed: List[Dict[str, Any]],
+    target: str,
+) -> None:
+    """
+    Move each course's watermark up to the newest synced updated_at.
+    A course/type with any failed item keeps its old watermark so the
+    failures are retried next run.
+    """
+    blocked = {_watermark_key(it) for it in failed}
+    newest: Dict[str, datetime] = {}
+    for it in synced:
+        key = _watermark_key(it)
+        updated = _parse_updated_at(it.get("updated_at"))
+        if key in blocked or updated is None:
+            continue
+        if key not in newest or updated > newest[key]:
+            newest[key] = updated
+    if not newest:
+        return
+
+    with _SYNC_STATE_LOCK:
+        state = _load_sync_state()
+        marks = state.setdefault("watermarks", {}).setdefault(target, {})
+        for key, updated in newest.items():
+            mark = _parse_updated_at(marks.get(key))
+            if mark is None or updated > mark:
+                marks[key] = updated.isoformat()
+        _save_sync_state(state)
+
+
+# ============================================================================
+# Local item store (SQLite)
+# ============================================================================
+
+ITEM_STORE_PATH = Path(os.getenv("CANVAS_ITEM_STORE") or Path(__file__).with_name(".canvas_items.sqlite3"))
+
+_ITEM_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    id         INTEGER PRIMARY KEY,
+    name       TEXT,
+    data       TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    type       TEXT NOT NULL,
+    course_id  INTEGER NOT NULL,
+    id         TEXT NOT NULL,
+    name       TEXT,
+    starts_at  TEXT,
+    data       TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (type, course_id, id)
+);
+CREATE INDEX IF NOT EXISTS items_course ON items (course_id);
+CREATE INDEX IF NOT EXISTS items_starts_at ON items (starts_at);
+"""
+
+
+def _normalize_when(value: str | None) -> str | None:
+    """ISO timestamp as a sortable string: UTC 'Z' form when the value carries an offset."""
+    if not value:
+        return None
+    try:
+        dt = date_parser.isoparse(value)
+    except (ValueError, OverflowError):
+        return value
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        return dt.isoformat(timespec="seconds") + "Z"
+    return dt.isoformat(timespec="seconds")
+
+
+def _item_starts_at(item: Dict[str, Any]) -> str | None:
+    return _normalize_when(item.get("due_date") or item.get("start_date"))
+
+
+class _ItemStore:
+    """
+    SQLite copy of fetched courses and items, so tools and canvas://
+    resources keep working across restarts without a Canvas refetch.
+    Items are keyed by (type, course_id, id) and written with upserts,
+    so fetching the same course again replaces rows instead of piling up.
+    Items without a Canvas id (syllabus-derived) use name@start instead.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        # Caller holds self._lock; tools run on worker threads
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.executescript(_ITEM_STORE_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _item_row(item: Dict[str, Any], fetched_at: str) -> tuple:
+        starts_at = _item_starts_at(item)
+        item_id = item.get("id")
+        if item_id is None:
+            item_id = f"{item.get('name')}@{starts_at}"
+        return (item.get("type", "item"), item.get("course_id") or 0, str(item_id),
+                item.get("name"), starts_at, json.dumps(item), fetched_at)
+
+    def replace_courses(self, courses: List[Dict[str, Any]]) -> None:
+        """
+        Store the active course list, dropping courses no longer returned
+        (new term, dropped class) together with their items, so syncs,
+        pruning and canvas://assignments stop seeing them. A list holding a
+        Canvas error placeholder leaves the store untouched. Items without
+        a course (course_id 0) are kept.
+        """
+        if any("error" in c for c in courses):
+            return
+        fetched_at = datetime.now().isoformat(timespec="seconds")
+        rows = [(c["id"], c.get("name"), json.dumps(c), fetched_at) for c in courses]
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM courses")
+                db.executemany("INSERT INTO courses VALUES (?, ?, ?, ?)", rows)
+                db.execute("DELETE FROM items WHERE course_id != 0 "
+                           "AND course_id NOT IN (SELECT id FROM courses)")
+
+    def courses(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db().execute("SELECT data FROM courses ORDER BY name").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def upsert_items(self, items: List[Dict[str, Any]],
+                     replace_courses: List[int] | None = None,
+                     window: Tuple[str, str] | None = None) -> int:
+        """
+        Insert or update items; error placeholders are not stored. With
+        replace_courses, existing rows for those course ids are dropped first,
+        so items deleted in Canvas disappear on the next full fetch. When the
+        fetch covered only a (start, end) date window, pass it as `window`:
+        only rows due/starting inside it are dropped, less a day at each edge
+        since Canvas applies the window in the user's time zone.
+        """
+        fetched_at = datetime.now().isoformat(timespec="seconds")
+        rows = [self._item_row(it, fetched_at) for it in items if "error" not in it]
+        sql, bounds = "DELETE FROM items WHERE course_id = ?", ()
+        if window:
+            start, end = (datetime.fromisoformat(d[:10]) for d in window)
+            sql += " AND starts_at >= ? AND starts_at < ?"
+            bounds = ((start + timedelta(days=1)).isoformat(), end.isoformat())
+        with self._lock:
+            db = self._db()
+            with db:
+                if replace_courses:
+                    db.executemany(sql, [(cid, *bounds) for cid in replace_courses])
+                db.executemany(
+                    "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (type, course_id, id) DO UPDATE SET "
+                    "name = excluded.name, starts_at = excluded.starts_at, "
+                    "data = excluded.data, fetched_at = excluded.fetched_at",
+                    rows,
+                )
+        return len(rows)
+
+    def items(self, course_id: int | None = None, item_type: str | None = None,
+              since: str | None = None, until: str | None = None) -> List[Dict[str, Any]]:
+        """Stored items matching the filters (see page), in due/start order."""
+        return self.page(course_id, item_type, since, until)[0]
+
+    def page(
+        self,
+        course_id: int | None = None,
+        item_type: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        cursor: str | None = None,
+        limit: int | None = None,
+    ) -> Tuple[List[Dict[str, Any]], str | None]:
+        """
+        One page of stored items in due/start order and the cursor for the
+        next page (None on the last one). since is inclusive and until
+        exclusive; both compare against the item's due/start time, so
+        undated items are left out when either is set. The cursor is the
+        sort key of the last row returned, so pages stay stable while the
+        store is written to.
+        """
+        order = "COALESCE(starts_at, ''), course_id, type, id"
+        sql, args = "SELECT COALESCE(starts_at, ''), course_id, type, id, data FROM items WHERE 1 = 1", []
+        if course_id is not None:
+            sql += " AND course_id = ?"
+            args.append(course_id)
+        if item_type:
+            sql += " AND type = ?"
+            args.append(item_type)
+        if since:
+            sql += " AND starts_at >= ?"
+            args.append(_normalize_when(since))
+        if until:
+            sql += " AND starts_at < ?"
+            args.append(_normalize_when(until))
+        if cursor:
+            sql += f" AND ({order}) > (?, ?, ?, ?)"
+            args.extend(self._decode_cursor(cursor))
+        sql += f" ORDER BY {order}"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit + 1)  # one extra row tells us whether another page exists
+        with self._lock:
+            rows = self._db().execute(sql, args).fetchall()
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1][:4])
+        return [json.loads(row[4]) for row in rows], next_cursor
+
+    @staticmethod
+    def _encode_cursor(key: tuple) -> str:
+        raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> list:
+        try:
+            key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        except (ValueError, TypeError):
+            key = None
+        if not isinstance(key, list) or len(key) != 4:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return key
+
+    def stats(self) -> dict:
+        with self._lock:
+            db = self._db()
+            courses = db.execute("SELECT COUNT(*) FROM courses").fetchone()[0]
+            items = db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        return {"path": str(self.path), "courses": courses, "items": items}
+
+
+ITEM_STORE = _ItemStore(ITEM_STORE_PATH)
+
+
 # ============================================================================
 # Outlook/Microsoft Graph Functions
 # ============================================================================
 
 # Delegated auth (Device Code) â€” no client secret needed
-def get_outlook_token() -> str:
-    """Acquire a delegated Graph token (Calendars.ReadWrite) via Device Code flow."""
-    from msal import PublicClientApplication
-
-    app = PublicClientApplication(
-        client_id=OUTLOOK_CLIENT_ID,
-        authority=f"https://login.microsoftonline.com/{OUTLOOK_TENANT_ID}",
+OUTLOOK_SCOPES = ["Calendars.ReadWrite"]
+OUTLOOK_TOKEN_CACHE_PATH = Path(os.getenv("OUTLOOK_TOKEN_CACHE") or Path(__file__).with_name("msal_token_cache.bin"))
+# Refresh this many seconds before the access token expires
+OUTLOOK_REFRESH_MARGIN = 300
+
+_OUTLOOK_LOCK = threading.RLock()
+_OUTLOOK_APP = None
+_OUTLOOK_CACHE = None
+_OUTLOOK_TOKEN: Dict[str, Any] = {"access_token": None, "expires_at": 0.0}
+_OUTLOOK_REFRESH_TIMER: threading.Timer | None = None
+
+
+def _outlook_app():
+    """Process-wide MSAL app backed by a token cache persisted to disk."""
+    global _OUTLOOK_APP, _OUTLOOK_CACHE
+    if _OUTLOOK_APP is None:
+        from msal import PublicClientApplication, SerializableTokenCache
+
+        cache = SerializableTokenCache()
+        if OUTLOOK_TOKEN_CACHE_PATH.exists():
+            cache.deserialize(OUTLOOK_TOKEN_CACHE_PATH.read_text(encoding="utf-8"))
+        _OUTLOOK_CACHE = cache
+        _OUTLOOK_APP = PublicClientApplication(
+            client_id=OUTLOOK_CLIENT_ID,
+            authority=f"https://login.microsoftonline.com/{OUTLOOK_TENANT_ID}",
+            token_cache=cache,
+        )
+    return _OUTLOOK_APP
+
+
+def _persist_outlook_cache() -> None:
+    if _OUTLOOK_CACHE is not None and _OUTLOOK_CACHE.has_state_changed:
+        # Holds refresh tokens: owner-only, including a file an older version left 0644
+        fd = os.open(OUTLOOK_TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(_OUTLOOK_CACHE.serialize())
+        _OUTLOOK_CACHE.has_state_changed = False
+
+
+def _remember_outlook_token(result: Dict[str, Any]) -> str:
+    """Keep the token in memory, persist the MSAL cache, and schedule the next refresh."""
+    global _OUTLOOK_REFRESH_TIMER
+    expires_in = float(result.get("expires_in") or 3600)
+    _OUTLOOK_TOKEN["access_token"] = result["access_token"]
+    _OUTLOOK_TOKEN["expires_at"] = time.time() + expires_in
+    _persist_outlook_cache()
+
+    if _OUTLOOK_REFRESH_TIMER is not None:
+        _OUTLOOK_REFRESH_TIMER.cancel()
+    _OUTLOOK_REFRESH_TIMER = threading.Timer(
+        max(1.0, expires_in - OUTLOOK_REFRESH_MARGIN), _refresh_outlook_token
     )
-    scopes = ["Calendars.ReadWrite"]
-
-    # Try a silent token first (re-uses cached accounts if youâ€™ve signed in before)
-    accounts = app.get_accounts()
-    if accounts:
-        result = app.acquire_token_silent(scopes=scopes, account=accounts[0])
-        if result and "access_token" in result:
-            return result["access_token"]
-
-    # Interactive device code (prints a URL + code to the console)
-    flow = app.initiate_device_flow(scopes=scopes)
-    if "user_code" not in flow:
-        raise RuntimeError(f"Device flow init failed: {flow}")
-    print(f"\nTo sign in, open {flow['verification_uri']} and enter code: {flow['user_code']}\n")
-    result = app.acquire_token_by_device_flow(flow)  # blocks until you complete sign-in
-    if "access_token" not in result:
-        raise RuntimeError(f"Token error: {result.get('error_description') or result}")
+    _OUTLOOK_REFRESH_TIMER.daemon = True
+    _OUTLOOK_REFRESH_TIMER.start()
     return result["access_token"]
 
 
-def create_outlook_event(token: str, event_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Create a calendar event in the signed-in user's calendar (/me/events)."""
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-    }
+def _refresh_outlook_token() -> None:
+    """Background refresh ahead of expiry; on failure the next call falls back to sign-in."""
+    with _OUTLOOK_LOCK:
+        app = _outlook_app()
+        accounts = app.get_accounts()
+        if not accounts:
+            return
+        result = app.acquire_token_silent(scopes=OUTLOOK_SCOPES, account=accounts[0], force_refresh=True)
+        if result and "access_token" in result:
+            _remember_outlook_token(result)
+
 
+def get_outlook_token() -> str:
+    """Acquire a delegated Graph token (Calendars.ReadWrite) via Device Code flow."""
+    with _OUTLOOK_LOCK:
+        if _OUTLOOK_TOKEN["access_token"] and time.time() < _OUTLOOK_TOKEN["expires_at"] - OUTLOOK_REFRESH_MARGIN:
+            return _OUTLOOK_TOKEN["access_token"]
+
+        app = _outlook_app()
+
+        # Try a silent token first (the persisted cache keeps accounts across restarts)
+        accounts = app.get_accounts()
+        if accounts:
+            result = app.acquire_token_silent(scopes=OUTLOOK_SCOPES, account=accounts[0])
+            if result and "access_token" in result:
+                return _remember_outlook_token(result)
+
+        # Interactive device code (prints a URL + code to the console)
+        flow = app.initiate_device_flow(scopes=OUTLOOK_SCOPES)
+        if "user_code" not in flow:
+            raise RuntimeError(f"Device flow init failed: {flow}")
+        print(f"\nTo sign in, open {flow['verification_uri']} and enter code: {flow['user_code']}\n")
+        result = app.acquire_token_by_device_flow(flow)  # blocks until you complete sign-in
+        if "access_token" not in result:
+            raise RuntimeError(f"Token error: {result.get('error_description') or result}")
+        return _remember_outlook_token(result)
+
+
+GRAPH_BASE = "https://graph.microsoft.com/v1.0"
+# Graph JSON batching accepts at most 20 sub-requests per call
+GRAPH_BATCH_SIZE = 20
+GRAPH_BATCH_RETRIES = 5
+# Named extended property carrying the canvas_key on each Outlook event
+OUTLOOK_CANVAS_KEY_PROP = "String {5d0b9f0e-3c1a-4f6b-9a53-7e2c0c1d8a41} Name canvas_key"
+_GRAPH_SESSION: requests.Session | None = None
+
+def _graph_session() -> requests.Session:
+    global _GRAPH_SESSION
+    if _GRAPH_SESSION is None:
+        _GRAPH_SESSION = requests.Session()
+    return _GRAPH_SESSION
+
+def _outlook_event_payload(event_data: Dict[str, Any]) -> Dict[str, Any]:
     # Accept either start_date (syllabus/events) or due_date (assignments)
     start_str = event_data.get("start_date") or event_data.get("due_date")
     if not start_str:
         raise ValueError("Missing start_date/due_date in event_data")
 
     start_dt = date_parser.parse(start_str)
-    end_dt = date_parser.parse(event_data.get("end_date", start_str))
+    end_dt = date_parser.parse(event_data.get("end_date") or start_str)
     if end_dt == start_dt:
         # Default to a 1-hour window if only a single timestamp is provided
-        end_dt = start_dt.replace(hour=start_dt.hour + 1)
+        end_dt = start_dt + timedelta(hours=1)
 
-    payload = {
+    return {
         "subject": f"{event_data.get('course_name','Course')}: {event_data.get('name','Item')}",
         "body": {"contentType": "HTML", "content": event_data.get("description", "")},
         "start": {"dateTime": start_dt.isoformat(), "timeZone": "America/New_York"},
         "end":   {"dateTime": end_dt.isoformat(),   "timeZone": "America/New_York"},
         "categories": ["Canvas", event_data.get("type", "item")],
+        "singleValueExtendedProperties": [
+            {"id": OUTLOOK_CANVAS_KEY_PROP, "value": _canvas_key(event_data)},
+        ],
     }
 
-    r = requests.post("https://graph.microsoft.com/v1.0/me/events", headers=headers, json=payload)
+def create_outlook_event(token: str, event_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a calendar event in the signed-in user's calendar (/me/events)."""
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+    }
+    payload = _outlook_event_payload(event_data)
+
+    r = _graph_session().post(f"{GRAPH_BASE}/me/events", headers=headers, json=payload, timeout=30)
     r.raise_for_status()
     return r.json()
+
+def _graph_error(status: int, body: Any) -> RuntimeError:
+    message = ((body or {}).get("error") or {}).get("message") if isinstance(body, dict) else None
+    return RuntimeError(f"Graph {status}: {message or body}")
+
+def _retry_after(headers: Dict[str, Any] | None, default: float = 1.0) -> float:
+    for k, v in (headers or {}).items():
+        if k.lower() == "retry-after":
+            try:
+                return float(v)
+            except (TypeError, ValueError):
+                break
+    return default
+
+def _execute_graph_batch(
+    token: str,
+    calls: List[Tuple[str, Dict[str, Any]]],
+    on_results: Callable[[Dict[str, Tuple[int, Any]]], None] | None = None,
+) -> Dict[str, Tuple[int, Any]]:
+    """
+    Send (id, sub-request) pairs through Graph's JSON $batch endpoint,
+    GRAPH_BATCH_SIZE at a time. Sub-requests answered 429 are resent after
+    their Retry-After (up to GRAPH_BATCH_RETRIES rounds). A batch request
+    that fails as a whole (5xx, timeout) becomes an error for each of its
+    sub-requests rather than an exception, so earlier chunks' results are
+    not lost; on_results, if given, receives each chunk's final results as
+    they arrive. Returns id -> (status, body).
+    """
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    results: Dict[str, Tuple[int, Any]] = {}
+    pending = list(calls)
+    for _ in range(GRAPH_BATCH_RETRIES + 1):
+        if not pending:
+            break
+        throttled: List[Tuple[str, Dict[str, Any]]] = []
+        wait = 0.0
+        by_id = dict(pending)
+        for i in range(0, len(pending), GRAPH_BATCH_SIZE):
+            _check_cancelled()
+            chunk = pending[i:i + GRAPH_BATCH_SIZE]
+            body = {"requests": [{"id": cid, **req} for cid, req in chunk]}
+            done: Dict[str, Tuple[int, Any]] = {}
+            try:
+                r = _graph_session().post(f"{GRAPH_BASE}/$batch", headers=headers, json=body, timeout=60)
+                if r.status_code == 429:
+                    throttled.extend(chunk)
+                    wait = max(wait, _retry_after(r.headers))
+                    continue
+                r.raise_for_status()
+                for sub in r.json().get("responses", []):
+                    cid = str(sub.get("id"))
+                    if sub.get("status") == 429:
+                        throttled.append((cid, by_id[cid]))
+                        wait = max(wait, _retry_after(sub.get("headers")))
+                    else:
+                        done[cid] = (sub.get("status", 0), sub.get("body"))
+            except (requests.RequestException, ValueError) as e:
+                status = getattr(getattr(e, "response", None), "status_code", None) or 0
+                done = {cid: (status, {"error": {"message": f"Batch request failed: {e}"}})
+                        for cid, _ in chunk}
+            finally:
+                _report_progress(f"Outlook batch: {min(i + GRAPH_BATCH_SIZE, len(pending))}/{len(pending)} calls")
+            results.update(done)
+            if on_results and done:
+                on_results(done)
+        pending = throttled
+        if pending:
+            time.sleep(wait)
+    exhausted = {cid: (429, {"error": {"message": "Throttled; retries exhausted"}}) for cid, _ in pending}
+    results.update(exhausted)
+    if on_results and exhausted:
+        on_results(exhausted)
+    return results
+
+def _graph_pages(token: str, url: str, params: Dict[str, Any] | None = None) -> Iterator[Dict[str, Any]]:
+    """Yield Graph response pages, following @odata.nextLink."""
+    headers = {"Authorization": f"Bearer {token}", "Prefer": "odata.maxpagesize=200"}
+    while url:
+        r = _graph_session().get(url, headers=headers, params=params, timeout=60)
+        r.raise_for_status()
+        page = r.json()
+        yield page
+        url = page.get("@odata.nextLink")
+        params = None  # nextLink already carries the query
+
+def _load_outlook_index() -> Dict[str, Dict[str, Any]]:
+    """canvas_key -> {"id", "changeKey", "hash"} for events we have written to Outlook."""
+    return _load_sync_state().get("outlook_index", {})
+
+def _save_outlook_index(index: Dict[str, Dict[str, Any]], delta_link: str | None = None) -> None:
+    with _SYNC_STATE_LOCK:
+        state = _load_sync_state()
+        state["outlook_index"] = index
+        if delta_link is not None:
+            state["outlook_delta_link"] = delta_link
+        _save_sync_state(state)
+
+def reconcile_outlook_index(token: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Refresh the local Outlook index and return it for the sync run.
+    The first run discovers every event carrying the canvas_key extended
+    property and starts a /me/calendarView/delta round over the sync window;
+    later runs follow the stored deltaLink and only read changes. Events
+    changed outside this tool (changeKey differs) lose their hash so the next
+    upsert rewrites them; removed events are dropped.
+    """
+    state = _load_sync_state()
+    delta_link = state.get("outlook_delta_link")
+    index = dict(state.get("outlook_index", {}))
+
+    if not delta_link:
+        index = {}
+        params = {
+            "$filter": f"singleValueExtendedProperties/Any(ep: ep/id eq '{OUTLOOK_CANVAS_KEY_PROP}' and ep/value ne null)",
+            "$expand": f"singleValueExtendedProperties($filter=id eq '{OUTLOOK_CANVAS_KEY_PROP}')",
+            "$select": "id,changeKey",
+        }
+        for page in _graph_pages(token, f"{GRAPH_BASE}/me/events", params):
+            for ev in page.get("value", []):
+                props = ev.get("singleValueExtendedProperties") or []
+                if props:
+                    index[props[0]["value"]] = {"id": ev["id"], "changeKey": ev.get("changeKey"), "hash": None}
+        today = datetime.now().date()
+        url = f"{GRAPH_BASE}/me/calendarView/delta"
+        params = {
+            "startDateTime": (today - timedelta(days=PLANNER_LOOKBACK_DAYS)).isoformat(),
+            "endDateTime": (today + timedelta(days=SYNC_HORIZON_DAYS)).isoformat(),
+        }
+    else:
+        url, params = delta_link, None
+
+    by_id = {entry["id"]: key for key, entry in index.items()}
+    new_link = None
+    for page in _graph_pages(token, url, params):
+        for ev in page.get("value", []):
+            key = by_id.get(ev.get("id"))
+            if not key:
+                continue
+            if "@removed" in ev:
+                index.pop(key, None)
+            elif ev.get("changeKey") != index[key].get("changeKey"):
+                index[key] = {"id": ev["id"], "changeKey": ev.get("changeKey"), "hash": None}
+        new_link = page.get("@odata.deltaLink") or new_link
+
+    _save_outlook_index(index, new_link)
+    return index
+
+def batch_upsert_outlook_events(
+    token: str,
+    items: List[Dict[str, Any]],
+) -> List[Tuple[Dict[str, Any], Dict[str, Any] | None, Exception | None]]:
+    """
+    Upsert items into Outlook via Graph $batch (20 per request), keyed by the
+    canvas_key extended property. Uses the index from reconcile_outlook_index:
+    unchanged items are skipped, known ones are PATCHed by id, the rest are
+    POSTed. Returns (item, event, error) per item, in order; skipped items get
+    their index entry as the event.
+    """
+    results: List[Tuple[Dict[str, Any], Dict[str, Any] | None, Exception | None]] = \
+        [(it, None, None) for it in items]
+    index = _load_outlook_index()
+    prepared: Dict[str, Tuple[str, Dict[str, Any], str]] = {}
+    for idx, it in enumerate(items):
+        try:
+            payload = _outlook_event_payload(it)
+        except Exception as e:
+            results[idx] = (it, None, e)
+            continue
+        body_hash = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+        prepared[str(idx)] = (_canvas_key(it), payload, body_hash)
+
+    def create_call(cid: str) -> Tuple[str, Dict[str, Any]]:
+        return (cid, {
+            "method": "POST",
+            "url": "/me/events",
+            "headers": {"Content-Type": "application/json"},
+            "body": prepared[cid][1],
+        })
+
+    calls = []
+    for cid, (key, payload, body_hash) in prepared.items():
+        known = index.get(key)
+        if not known:
+            calls.append(create_call(cid))
+        elif known.get("hash") == body_hash:
+            results[int(cid)] = (items[int(cid)], known, None)
+        else:
+            calls.append((cid, {
+                "method": "PATCH",
+                "url": f"/me/events/{known['id']}",
+                "headers": {"Content-Type": "application/json"},
+                "body": payload,
+            }))
+
+    gone: List[str] = []
+
+    def apply(responses: Dict[str, Tuple[int, Any]], retry_gone: bool) -> None:
+        # Saved per chunk: if a later chunk fails or the tool is cancelled,
+        # events already created are still known and won't be POSTed again
+        for cid, (status, body) in responses.items():
+            idx = int(cid)
+            key, _, body_hash = prepared[cid]
+            if 200 <= status < 300:
+                results[idx] = (items[idx], body, None)
+                index[key] = {"id": body.get("id"), "changeKey": body.get("changeKey"), "hash": body_hash}
+            elif status == 404 and retry_gone:
+                gone.append(cid)
+            else:
+                results[idx] = (items[idx], None, _graph_error(status, body))
+        _save_outlook_index(index)
+
+    _execute_graph_batch(token, calls, lambda done: apply(done, True))
+    # Events deleted in Outlook since the last reconcile: recreate them
+    _execute_graph_batch(token, [create_call(cid) for cid in gone], lambda done: apply(done, False))
+    return results
+
+
 # =========================
 # Google Calendar Functions
 # =========================
 GCAL_SCOPES = [(os.getenv("GCAL_SCOPES") or "https://www.googleapis.com/auth/calendar.events")]
 
+# Refresh this many seconds before the Google access token expires
+GCAL_REFRESH_MARGIN = 300
+
+_GCAL_LOCK = threading.RLock()
+_GCAL_SERVICE = None
+_GCAL_CREDS = None
+_GCAL_REFRESH_TIMER: threading.Timer | None = None
+# httplib2.Http is not thread-safe: each thread gets its own (kept for keep-alive)
+_GCAL_HTTP = threading.local()
+
+def _gcal_thread_http(creds):
+    """AuthorizedHttp for the calling thread, rebuilt when the credentials object changes."""
+    http = getattr(_GCAL_HTTP, "http", None)
+    if http is None or http.credentials is not creds:
+        import google_auth_httplib2
+        import httplib2
+
+        http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=60))
+        _GCAL_HTTP.http = http
+    return http
+
+def _save_gcal_token(creds) -> None:
+    """Write token.json only when the serialized credentials actually changed."""
+    token_path = Path(__file__).with_name("token.json")
+    text = creds.to_json()
+    try:
+        if token_path.read_text(encoding="utf-8") == text:
+            return
+    except OSError:
+        pass
+    token_path.write_text(text, encoding="utf-8")
+
+def _schedule_gcal_refresh(creds) -> None:
+    global _GCAL_REFRESH_TIMER
+    if _GCAL_REFRESH_TIMER is not None:
+        _GCAL_REFRESH_TIMER.cancel()
+        _GCAL_REFRESH_TIMER = None
+    if not creds.expiry or not creds.refresh_token:
+        return
+    # google-auth keeps expiry as naive UTC
+    delay = (creds.expiry - datetime.now(timezone.utc).replace(tzinfo=None)).total_seconds() - GCAL_REFRESH_MARGIN
+    _GCAL_REFRESH_TIMER = threading.Timer(max(1.0, delay), _refresh_gcal_creds)
+    _GCAL_REFRESH_TIMER.daemon = True
+    _GCAL_REFRESH_TIMER.start()
+
+def _refresh_gcal_creds() -> None:
+    """Refresh the shared credentials ahead of expiry (runs on a timer thread)."""
+    from google.auth.transport.requests import Request
+
+    with _GCAL_LOCK:
+        if _GCAL_CREDS is None:
+            return
+        try:
+            _GCAL_CREDS.refresh(Request())
+        except Exception:
+            return  # next get_gcal_service() retries
+        _save_gcal_token(_GCAL_CREDS)
+        _schedule_gcal_refresh(_GCAL_CREDS)
+
 def get_gcal_service():
     """
     Returns an authenticated Google Calendar service.
     Uses credentials.json (in this folder) and caches token.json after first consent.
+    The service is built once per process from the bundled discovery document
+    and shared across threads; its requests go out over a per-thread
+    keep-alive connection (_gcal_thread_http). Credentials are refreshed in
+    the background before they expire.
     """
-    token_path = Path(__file__).with_name("token.json")
-    creds_path = Path(__file__).with_name("credentials.json")
-
-    creds = None
-    if token_path.exists():
-        creds = Credentials.from_authorized_user_file(str(token_path), GCAL_SCOPES)
-
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            if not creds_path.exists():
-                raise RuntimeError("Missing credentials.json next to server.py (Desktop OAuth client).")
-            flow = InstalledAppFlow.from_client_secrets_file(str(creds_path), GCAL_SCOPES)
-            creds = flow.run_local_server(port=0)
-        token_path.write_text(creds.to_json(), encoding="utf-8")
-
-    return build("calendar", "v3", credentials=creds, cache_discovery=False)
+    global _GCAL_SERVICE, _GCAL_CREDS
+    with _GCAL_LOCK:
+        if _GCAL_SERVICE is not None and _GCAL_CREDS is not None and _GCAL_CREDS.valid:
+            return _GCAL_SERVICE
+
+        from google.oauth2.credentials import Credentials
+        from google.auth.transport.requests import Request
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from googleapiclient.discovery import build
+        from googleapiclient.http import HttpRequest
+
+        creds = _GCAL_CREDS
+        if creds is None:
+            token_path = Path(__file__).with_name("token.json")
+            if token_path.exists():
+                creds = Credentials.from_authorized_user_file(str(token_path), GCAL_SCOPES)
+
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                creds_path = Path(__file__).with_name("credentials.json")
+                if not creds_path.exists():
+                    raise RuntimeError("Missing credentials.json next to server.py (Desktop OAuth client).")
+                flow = InstalledAppFlow.from_client_secrets_file(str(creds_path), GCAL_SCOPES)
+                creds = flow.run_local_server(port=0)
+                _GCAL_SERVICE = None  # new identity, rebuild
+            _save_gcal_token(creds)
+
+        if _GCAL_SERVICE is None or creds is not _GCAL_CREDS:
+            def request_builder(_http, *args, **kwargs):
+                return HttpRequest(_gcal_thread_http(creds), *args, **kwargs)
+
+            _GCAL_SERVICE = build("calendar", "v3", credentials=creds, requestBuilder=request_builder,
+                                  cache_discovery=False, static_discovery=True)
+        _GCAL_CREDS = creds
+        _schedule_gcal_refresh(creds)
+        return _GCAL_SERVICE
 
 def _stable_gcal_id(event_data: dict, start_iso: str) -> str:
     """Stable ID to avoid duplicates on re-sync."""
     base = f"{event_data.get('type','item')}|{event_data.get('course_name','')}|{event_data.get('name','')}|{start_iso}"
     return "canvas-" + hashlib.md5(base.encode("utf-8")).hexdigest()
 
-def create_google_event(service, event_data: dict, calendar_id: str = "primary") -> dict:
-    """
-    Upsert an event to Google Calendar using a stable key in extendedProperties.private.canvas_key.
-    Accepts assignment 'due_date' or event 'start_date' (with optional 'end_date').
-    """
+def _canvas_key(event_data: dict) -> str:
+    """Stable key per Canvas item (type:course_id:id), stored on the calendar event."""
+    return f"{event_data.get('type','item')}:{event_data.get('course_id')}:{event_data.get('id') or event_data.get('name')}"
+
+def _google_event_body(event_data: dict) -> tuple[str, dict]:
+    """(canvas_key, Calendar event body) for a Canvas item."""
     start_str = event_data.get("start_date") or event_data.get("due_date")
     if not start_str:
         raise ValueError("Missing start_date/due_date")
 
     start_dt = date_parser.parse(start_str)
-    end_dt = date_parser.parse(event_data.get("end_date", start_str))
+    end_dt = date_parser.parse(event_data.get("end_date") or start_str)
     if end_dt == start_dt:
         end_dt = start_dt.replace(hour=(start_dt.hour + 1) % 24)
 
     start_iso = start_dt.isoformat()
     end_iso = end_dt.isoformat()
 
-    # stable key per Canvas item
-    canvas_key = f"{event_data.get('type','item')}:{event_data.get('course_id')}:{event_data.get('id') or event_data.get('name')}"
+    canvas_key = _canvas_key(event_data)
 
     body = {
         "summary": f"{event_data.get('course_name','Course')}: {event_data.get('name','Item')}",
@@ -460,6 +2160,14 @@ def create_google_event(service, event_data: dict, calendar_id: str = "primary")
         "end":   {"dateTime": end_iso,   "timeZone": "America/New_York"},
         "extendedProperties": {"private": {"canvas_key": canvas_key}},
     }
+    return canvas_key, body
+
+def create_google_event(service, event_data: dict, calendar_id: str = "primary") -> dict:
+    """
+    Upsert an event to Google Calendar using a stable key in extendedProperties.private.canvas_key.
+    Accepts assignment 'due_date' or event 'start_date' (with optional 'end_date').
+    """
+    canvas_key, body = _google_event_body(event_data)
 
     # Look up by the same key; update if found, otherwise insert
     found = service.events().list(
@@ -474,7 +2182,337 @@ def create_google_event(service, event_data: dict, calendar_id: str = "primary")
     else:
         return service.events().insert(calendarId=calendar_id, body=body).execute()
 
-    return service.events().insert(calendarId=calendar_id, body=body).execute()
+# Google caps a batch at 50 calls for Calendar
+GCAL_BATCH_SIZE = 50
+
+def _execute_gcal_batch(
+    service,
+    calls: list[tuple[str, Any]],
+    on_results: Callable[[dict[str, tuple[Any, Exception | None]]], None] | None = None,
+) -> dict[str, tuple[Any, Exception | None]]:
+    """
+    Run (request_id, HttpRequest) pairs in batches; returns request_id -> (response, error).
+    on_results, if given, receives each batch's results as soon as it finishes.
+    """
+    results: dict[str, tuple[Any, Exception | None]] = {}
+    done: dict[str, tuple[Any, Exception | None]] = {}
+
+    def on_done(request_id, response, exception):
+        done[request_id] = (response, exception)
+
+    for i in range(0, len(calls), GCAL_BATCH_SIZE):
+        _check_cancelled()
+        chunk = calls[i:i + GCAL_BATCH_SIZE]
+        done = {}
+        batch = service.new_batch_http_request(callback=on_done)
+        for request_id, req in chunk:
+            batch.add(req, request_id=request_id)
+        try:
+            batch.execute()
+        except Exception as e:
+            # The batch failed as a whole (transport error, 5xx): fail each of
+            # its requests that has no answer yet and carry on with the rest
+            for request_id, _ in chunk:
+                done.setdefault(request_id, (None, e))
+        results.update(done)
+        if on_results and done:
+            on_results(done)
+        _report_progress(f"Google batch: {min(i + GCAL_BATCH_SIZE, len(calls))}/{len(calls)} calls")
+    return results
+
+def _gcal_body_hash(body: dict) -> str:
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _load_gcal_index(calendar_id: str) -> dict[str, dict]:
+    """canvas_key -> {"id", "etag", "hash"} for events we have written to `calendar_id`."""
+    return _load_sync_state().get("gcal_index", {}).get(calendar_id, {})
+
+def _save_gcal_index(calendar_id: str, updates: dict[str, dict | None]) -> None:
+    """Merge index changes (None removes a key) into the sync-state file."""
+    if not updates:
+        return
+    with _SYNC_STATE_LOCK:
+        state = _load_sync_state()
+        index = state.setdefault("gcal_index", {}).setdefault(calendar_id, {})
+        for key, entry in updates.items():
+            if entry is None:
+                index.pop(key, None)
+            else:
+                index[key] = entry
+        _save_sync_state(state)
+
+def _is_gone(error: Exception | None) -> bool:
+    status = getattr(getattr(error, "resp", None), "status", None)
+    return str(status) in ("404", "410")
+
+def batch_upsert_google_events(
+    service,
+    items: list[dict],
+    calendar_id: str = "primary",
+    index_complete: bool = False,
+) -> list[tuple[dict, dict | None, Exception | None]]:
+    """
+    Same upsert as create_google_event, but for many items at once.
+    The local gcal index (canvas_key -> event id + body hash) lets unchanged
+    items skip the API entirely and changed ones update by id directly; only
+    unknown keys need a canvas_key lookup. Lookups, then writes, go out in
+    batches of GCAL_BATCH_SIZE. Returns (item, event, error) per item, in
+    order; skipped items get their index entry as the event.
+    Pass index_complete=True right after reconcile_gcal_index: keys missing
+    from the index are then known to be new and are inserted without lookup.
+    """
+    results: list[tuple[dict, dict | None, Exception | None]] = [(it, None, None) for it in items]
+    index = _load_gcal_index(calendar_id)
+    index_updates: dict[str, dict | None] = {}
+    prepared: dict[str, tuple[str, dict, str]] = {}
+    for idx, it in enumerate(items):
+        try:
+            canvas_key, body = _google_event_body(it)
+            prepared[str(idx)] = (canvas_key, body, _gcal_body_hash(body))
+        except Exception as e:
+            results[idx] = (it, None, e)
+
+    def record(rid: str, response, error) -> None:
+        canvas_key, _, body_hash = prepared[rid]
+        results[int(rid)] = (items[int(rid)], response, error)
+        if error is None and response:
+            index_updates[canvas_key] = {
+                "id": response.get("id"), "etag": response.get("etag"), "hash": body_hash,
+            }
+
+    # 0) known keys: skip if unchanged, otherwise update by id
+    direct = []
+    unknown = []
+    for rid, (canvas_key, body, body_hash) in prepared.items():
+        known = index.get(canvas_key)
+        if not known:
+            unknown.append(rid)
+        elif known.get("hash") == body_hash:
+            results[int(rid)] = (items[int(rid)], known, None)
+        else:
+            direct.append((rid, service.events().update(
+                calendarId=calendar_id, eventId=known["id"], body=body)))
+    def save() -> None:
+        # Per batch, so a later failure or cancellation keeps earlier writes indexed
+        _save_gcal_index(calendar_id, index_updates)
+        index_updates.clear()
+
+    def on_direct(done) -> None:
+        for rid, (response, error) in done.items():
+            if _is_gone(error):
+                # Deleted on the Google side; forget it and go through lookup/insert
+                index_updates[prepared[rid][0]] = None
+                unknown.append(rid)
+            else:
+                record(rid, response, error)
+        save()
+
+    def on_writes(done) -> None:
+        for rid, (response, error) in done.items():
+            record(rid, response, error)
+        save()
+
+    _execute_gcal_batch(service, direct, on_direct)
+
+    # 1) look up existing events by canvas_key
+    lookups = [
+        (rid, service.events().list(
+            calendarId=calendar_id,
+            privateExtendedProperty=f"canvas_key={prepared[rid][0]}",
+            maxResults=1,
+        ))
+        for rid in unknown
+    ] if not index_complete else []
+    found = _execute_gcal_batch(service, lookups)
+
+    # 2) update what exists, insert the rest
+    writes = []
+    for rid in unknown:
+        body = prepared[rid][1]
+        response, error = found.get(rid, (None, None))
+        if error is not None:
+            results[int(rid)] = (items[int(rid)], None, error)
+            continue
+        existing = (response or {}).get("items", [])
+        if existing:
+            req = service.events().update(calendarId=calendar_id, eventId=existing[0]["id"], body=body)
+        else:
+            req = service.events().insert(calendarId=calendar_id, body=body)
+        writes.append((rid, req))
+
+    _execute_gcal_batch(service, writes, on_writes)
+    return results
+
+
+def _load_gcal_sync_token(calendar_id: str) -> str | None:
+    return _load_sync_state().get("gcal_sync_token", {}).get(calendar_id)
+
+def _save_gcal_sync_token(calendar_id: str, token: str | None) -> None:
+    with _SYNC_STATE_LOCK:
+        state = _load_sync_state()
+        state.setdefault("gcal_sync_token", {})[calendar_id] = token
+        _save_sync_state(state)
+
+def reconcile_gcal_index(service, calendar_id: str = "primary") -> dict[str, dict]:
+    """
+    Bring the local gcal index in line with the calendar and return it
+    (canvas_key -> {"id", "etag", "hash"}) for use across a sync run.
+    The first run pages through every event and keeps the ones carrying a
+    canvas_key; later runs send the stored nextSyncToken and only read the
+    delta. Events edited outside this tool lose their stored hash so the
+    next upsert rewrites them; cancelled events are dropped.
+    """
+    token = _load_gcal_sync_token(calendar_id)
+    index = {} if token is None else dict(_load_gcal_index(calendar_id))
+    by_id = {entry["id"]: key for key, entry in index.items()}
+
+    page_token = None
+    while True:
+        params = {"calendarId": calendar_id, "maxResults": 2500, "pageToken": page_token}
+        if token:
+            params["syncToken"] = token
+        try:
+            resp = service.events().list(**params).execute()
+        except Exception as e:
+            if token and _is_gone(e):
+                # Sync token expired: start over with a full listing
+                _save_gcal_sync_token(calendar_id, None)
+                return reconcile_gcal_index(service, calendar_id)
+            raise
+
+        for ev in resp.get("items", []):
+            key = ((ev.get("extendedProperties") or {}).get("private") or {}).get("canvas_key")
+            key = key or by_id.get(ev.get("id"))
+            if not key:
+                continue
+            if ev.get("status") == "cancelled":
+                index.pop(key, None)
+                continue
+            known = index.get(key) or {}
+            index[key] = {
+                "id": ev["id"],
+                "etag": ev.get("etag"),
+                "hash": known.get("hash") if known.get("etag") == ev.get("etag") else None,
+            }
+
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            next_token = resp.get("nextSyncToken")
+            break
+
+    with _SYNC_STATE_LOCK:
+        state = _load_sync_state()
+        state.setdefault("gcal_index", {})[calendar_id] = index
+        state.setdefault("gcal_sync_token", {})[calendar_id] = next_token
+        _save_sync_state(state)
+    return index
+
+def delete_google_orphans(
+    service,
+    index: dict[str, dict],
+    items: list[dict],
+    calendar_id: str = "primary",
+) -> tuple[int, list[str]]:
+    """
+    Batch-delete Canvas-owned events whose canvas_key no longer matches any
+    item (deleted or unpublished in Canvas). Only courses present in `items`
+    without fetch errors are pruned. Returns (deleted, errors).
+    """
+    keep = {_canvas_key(it) for it in items if "error" not in it}
+    courses = {str(it.get("course_id")) for it in items if "error" not in it}
+    courses -= {str(it.get("course_id")) for it in items if "error" in it}
+
+    orphans = []
+    for key, entry in index.items():
+        parts = key.split(":", 2)  # type:course_id:id
+        if key not in keep and len(parts) == 3 and parts[1] in courses:
+            orphans.append((key, entry))
+    calls = [
+        (key, service.events().delete(calendarId=calendar_id, eventId=entry["id"]))
+        for key, entry in orphans
+    ]
+    deleted = 0
+    errors: list[str] = []
+    updates: dict[str, dict | None] = {}
+    for key, (_, error) in _execute_gcal_batch(service, calls).items():
+        if error is None or _is_gone(error):
+            deleted += 1
+            updates[key] = None
+        else:
+            errors.append(f"{key}: {error}")
+    _save_gcal_index(calendar_id, updates)
+    return deleted, errors
+
+
+# ============================================================================
+# Tool & resource output
+# ============================================================================
+
+# Items per canvas://assignments page and per full-mode tool response
+RESOURCE_PAGE_SIZE = int(os.getenv("RESOURCE_PAGE_SIZE") or 100)
+RESOURCE_MAX_PAGE_SIZE = 1000
+_ITEM_QUERY_KEYS = ("course", "type", "since", "until", "cursor", "limit")
+
+
+def _compact_json(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _summarize_items(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Counts per course and type plus the due/start range, instead of the items themselves."""
+    by_course: Dict[str, Dict[str, int]] = {}
+    errors: list[str] = []
+    when: list[str] = []
+    for it in items:
+        if "error" in it:
+            errors.append(str(it["error"]))
+            continue
+        counts = by_course.setdefault(str(it.get("course_name") or it.get("course_id")), {})
+        kind = it.get("type", "item")
+        counts[kind] = counts.get(kind, 0) + 1
+        starts_at = _item_starts_at(it)
+        if starts_at:
+            when.append(starts_at)
+    summary: Dict[str, Any] = {
+        "total": len(items) - len(errors),
+        "by_course": by_course,
+        "first": min(when, default=None),
+        "last": max(when, default=None),
+    }
+    if errors:
+        summary["errors"] = errors[:20]
+    return summary
+
+
+def _items_text(header: str, items: List[Dict[str, Any]], summary: bool, resource_uri: str) -> str:
+    """Tool response body: a summary, or compact items capped at RESOURCE_PAGE_SIZE."""
+    if summary:
+        return f"{header}\n{_compact_json(_summarize_items(items))}\nItems: {resource_uri}"
+    shown = items[:RESOURCE_PAGE_SIZE]
+    text = f"{header}\n{_compact_json(shown)}"
+    if len(items) > len(shown):
+        text += f"\n({len(items) - len(shown)} more; page through {resource_uri})"
+    return text
+
+
+def _read_items_resource(query: Dict[str, str]) -> str:
+    """canvas://assignments?course=&type=&since=&until=&cursor=&limit= as one compact JSON page."""
+    unknown = set(query) - set(_ITEM_QUERY_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown query parameter(s): {', '.join(sorted(unknown))}")
+    limit = max(1, min(int(query.get("limit") or RESOURCE_PAGE_SIZE), RESOURCE_MAX_PAGE_SIZE))
+    items, next_cursor = ITEM_STORE.page(
+        course_id=int(query["course"]) if query.get("course") else None,
+        item_type=query.get("type"),
+        since=query.get("since"),
+        until=query.get("until"),
+        cursor=query.get("cursor"),
+        limit=limit,
+    )
+    next_uri = None
+    if next_cursor:
+        next_uri = "canvas://assignments?" + urlencode({**query, "cursor": next_cursor})
+    return _compact_json({"items": items, "next_cursor": next_cursor, "next": next_uri})
 
 
 # ============================================================================
@@ -490,7 +2528,12 @@ async def list_tools() -> List[Tool]:
             description="Fetch all active courses from Canvas",
             inputSchema={
                 "type": "object",
-                "properties": {},
+                "properties": {
+                    "summary": {
+                        "type": "boolean",
+                        "description": "Return only course ids and names"
+                    }
+                },
                 "required": []
             }
         ),
@@ -503,6 +2546,23 @@ async def list_tools() -> List[Tool]:
                     "course_id": {
                         "type": "integer",
                         "description": "Canvas course ID"
+                    },
+                    "bucket": {
+                        "type": "string",
+                        "enum": list(ASSIGNMENT_BUCKETS),
+                        "description": "Only assignments in this Canvas bucket (e.g. upcoming)"
+                    },
+                    "start_date": {
+                        "type": "string",
+                        "description": "Only calendar events on or after this ISO date"
+                    },
+                    "end_date": {
+                        "type": "string",
+                        "description": "Only calendar events on or before this ISO date"
+                    },
+                    "summary": {
+                        "type": "boolean",
+                        "description": "Return counts per type and the date range instead of the items"
                     }
                 },
                 "required": ["course_id"]
@@ -513,7 +2573,26 @@ async def list_tools() -> List[Tool]:
             description="Fetch assignments from all active courses",
             inputSchema={
                 "type": "object",
-                "properties": {},
+                "properties": {
+                    "bulk": {
+                        "type": "boolean",
+                        "description": (
+                            "Use multi-course calendar_events requests instead of per-course calls; "
+                            f"covers {PLANNER_LOOKBACK_DAYS} days back through {SYNC_HORIZON_DAYS} days ahead"
+                        )
+                    },
+                    "planner": {
+                        "type": "boolean",
+                        "description": (
+                            "Read items from the Canvas Planner API in one cross-course stream; "
+                            f"covers {PLANNER_LOOKBACK_DAYS} days back through {SYNC_HORIZON_DAYS} days ahead"
+                        )
+                    },
+                    "summary": {
+                        "type": "boolean",
+                        "description": "Return counts per course/type and the date range instead of the items (default true; page through canvas://assignments for the items)"
+                    }
+                },
                 "required": []
             }
         ),
@@ -527,6 +2606,10 @@ async def list_tools() -> List[Tool]:
                         "type": "array",
                         "items": {"type": "string"},
                         "description": "List of assignment IDs to sync (or 'all')"
+                    },
+                    "incremental": {
+                        "type": "boolean",
+                        "description": "Only sync items updated in Canvas since the last Outlook sync"
                     }
                 },
                 "required": []
@@ -550,6 +2633,14 @@ async def list_tools() -> List[Tool]:
             "calendar_id": {
                 "type": "string",
                 "description": "Target calendar ID; defaults to 'primary'"
+            },
+            "incremental": {
+                "type": "boolean",
+                "description": "Only sync items updated in Canvas since the last sync to this calendar"
+            },
+            "prune": {
+                "type": "boolean",
+                "description": "Delete calendar events for Canvas items that no longer exist (ignored with incremental)"
             }
         },
         "required": []
@@ -562,13 +2653,56 @@ async def list_tools() -> List[Tool]:
 
 @server.call_tool()
 async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
-    """Handle tool execution."""
+    """
+    Handle tool execution.
+    The blocking Canvas/Google/Graph work runs in a worker thread so the event
+    loop keeps serving other requests. Progress messages (per course / per
+    batch) go out as MCP progress notifications when the client sent a
+    progressToken, and a client cancel stops the worker at its next checkpoint.
+    """
+    loop = asyncio.get_running_loop()
+    cancel = threading.Event()
+    try:
+        ctx = server.request_context
+        progress_token = ctx.meta.progressToken if ctx.meta else None
+    except LookupError:
+        ctx, progress_token = None, None
+
+    steps = 0
+
+    def report(message: str) -> None:
+        nonlocal steps
+        if progress_token is None:
+            return
+        steps += 1
+        asyncio.run_coroutine_threadsafe(
+            ctx.session.send_progress_notification(progress_token, steps, message=message),
+            loop,
+        )
+
+    def work() -> List[TextContent]:
+        _TOOL_PROGRESS.set(report)
+        _TOOL_CANCEL.set(cancel)
+        return _call_tool_sync(name, arguments)
+
+    try:
+        return await asyncio.to_thread(work)
+    except asyncio.CancelledError:
+        cancel.set()
+        raise
+
+
+def _call_tool_sync(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     try:
         if name == "check_configuration":
             status = {
                 "canvas_token": "Set" if CANVAS_TOKEN else "Missing",
                 "outlook_client_id": "Set" if os.getenv("OUTLOOK_CLIENT_ID") else "Missing",
                 "outlook_secret": "Set" if os.getenv("OUTLOOK_CLIENT_SECRET") else "Missing",
+                "canvas_cache": _CANVAS_CACHE.stats(),
+                "syllabus_cache": _SYLLABUS_CACHE.stats(),
+                "syllabus_scans": syllabus_scan_stats(),
+                "item_store": ITEM_STORE.stats(),
             }
             return [TextContent(
                 type="text",
@@ -577,102 +2711,173 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
 
         elif name == "fetch_courses":
             courses = get_all_courses()
-            session_data["courses"] = courses
+            ITEM_STORE.replace_courses(courses)
+            if (arguments or {}).get("summary"):
+                courses = [{"id": c.get("id"), "name": c.get("name")} if "error" not in c else c
+                           for c in courses]
             return [TextContent(
                 type="text",
-                text=f"Found {len(courses)} active courses:\n{json.dumps(courses, indent=2)}"
+                text=f"Found {len(courses)} active courses:\n{_compact_json(courses)}"
             )]
 
         elif name == "fetch_course_assignments":
             course_id = int(arguments["course_id"])
-            assignments = get_course_assignments(course_id)
-            events = get_course_calendar_events(course_id)
+            assignments = get_course_assignments(course_id, bucket=arguments.get("bucket"))
+            events = get_course_calendar_events(
+                course_id, arguments.get("start_date"), arguments.get("end_date")
+            )
             all_items = assignments + events
-            session_data["assignments"].extend(all_items)
-            return [TextContent(
-                type="text",
-                text=f"Found {len(all_items)} items for course {course_id}:\n{json.dumps(all_items, indent=2)}"
-            )]
+            # Same shape as fetch_all_assignments rows, so the upsert doesn't
+            # strip course_name (and change every synced event body)
+            course_name = next((c.get("name") for c in ITEM_STORE.courses() if c.get("id") == course_id), None)
+            if course_name is None:
+                try:
+                    course_name = _canvas_get_course(course_id).get("name")
+                except Exception:
+                    course_name = None
+            for item in all_items:
+                if course_name and "error" not in item:
+                    item["course_name"] = course_name
+            ITEM_STORE.upsert_items(all_items)
+            return [TextContent(type="text", text=_items_text(
+                f"Found {len(all_items)} items for course {course_id}:", all_items,
+                bool(arguments.get("summary")), f"canvas://assignments?course={course_id}",
+            ))]
 
         elif name == "fetch_all_assignments":
-            if not session_data.get("courses"):
-                session_data["courses"] = get_all_courses()
-
-            all_assignments: list[dict] = []
-            for course in session_data["courses"]:
-                if "error" in course:
-                    continue
-                cid = course["id"]
-                cname = course["name"]
-
-                assignments = get_course_assignments(cid) or []
-                events = get_course_calendar_events(cid) or []
-
-                for item in assignments + events:
-                    item["course_name"] = cname
-                    all_assignments.append(item)
-
-            session_data["assignments"] = all_assignments
-            return [TextContent(
-                type="text",
-                text=f"Found {len(all_assignments)} total assignments/events:\n{json.dumps(all_assignments, indent=2)}"
-            )]
+            if (arguments or {}).get("planner"):
+                # One cross-course stream; items already carry course_name
+                all_assignments = list_planner_items()
+                # The planner covers every course, so it supersedes all stored rows
+                replaced = sorted({c["id"] for c in ITEM_STORE.courses()}
+                                  | {it.get("course_id") or 0 for it in all_assignments})
+            else:
+                # Always re-list so new enrollments / a new term show up; the
+                # stored list is only a fallback when Canvas can't be reached
+                courses = get_all_courses()
+                if any("error" in c for c in courses):
+                    courses = ITEM_STORE.courses() or courses
+                else:
+                    ITEM_STORE.replace_courses(courses)
+
+                courses = [c for c in courses if "error" not in c]
+                if (arguments or {}).get("bulk"):
+                    bulk = get_calendar_items_bulk([c["id"] for c in courses])
+                    per_course = [bulk[c["id"]] for c in courses]
+                else:
+                    per_course = fetch_courses_concurrently(
+                        courses, [get_course_assignments, get_course_calendar_events]
+                    )
+
+                all_assignments: list[dict] = []
+                replaced: list[int] = []
+                for course, items in zip(courses, per_course):
+                    for item in items:
+                        item["course_name"] = course["name"]
+                        all_assignments.append(item)
+                    # Keep the last good copy of a course whose fetch failed
+                    if not any("error" in item for item in items):
+                        replaced.append(course["id"])
+
+            # Every path reads events (and bulk/planner assignments) for
+            # sync_window() only; rows outside it stay until a fetch covers them
+            ITEM_STORE.upsert_items(all_assignments, replace_courses=replaced, window=sync_window())
+            return [TextContent(type="text", text=_items_text(
+                f"Found {len(all_assignments)} total assignments/events:", all_assignments,
+                (arguments or {}).get("summary", True), "canvas://assignments",
+            ))]
 
         elif name == "sync_to_outlook":
             token = get_outlook_token()
-            session_data["outlook_token"] = token
-
-            items = session_data.get("assignments") or []
-            if not items:
-                return [TextContent(
-                    type="text",
-                    text="No assignments/events found. Run 'fetch_all_assignments' (and optionally 'scan_syllabus') first."
-                )]
-
-            synced_count = 0
-            errors: list[str] = []
-            for it in items:
-                try:
-                    create_outlook_event(token, it)
-                    synced_count += 1
-                except Exception as e:
-                    errors.append(f"{it.get('name')}: {e}")
 
-            msg = f"Outlook: synced {synced_count} item(s)"
-            if errors:
-                msg += "\n\nErrors:\n" + "\n".join(errors[:20])
-
-            return [TextContent(type="text", text=msg)]
+            with sync_target_lock("outlook"):
+                items = ITEM_STORE.items()
+                if not items:
+                    return [TextContent(
+                        type="text",
+                        text="No assignments/events found. Run 'fetch_all_assignments' (and optionally 'scan_syllabus') first."
+                    )]
+
+                total = len(items)
+                index = reconcile_outlook_index(token)
+                if (arguments or {}).get("incremental"):
+                    items = filter_changed_items(items, "outlook", index)
+
+                synced_count = 0
+                errors: list[str] = []
+                ok_items: list[dict] = []
+                failed_items: list[dict] = []
+                for it, _, err in batch_upsert_outlook_events(token, items):
+                    if err is None:
+                        synced_count += 1
+                        ok_items.append(it)
+                    else:
+                        errors.append(f"{it.get('name')}: {err}")
+                        failed_items.append(it)
+                advance_watermarks(ok_items, failed_items, "outlook")
+
+                msg = f"Outlook: synced {synced_count} item(s)"
+                if len(items) < total:
+                    msg += f" ({total - len(items)} unchanged skipped)"
+                if errors:
+                    msg += "\n\nErrors:\n" + "\n".join(errors[:20])
+
+                return [TextContent(type="text", text=msg)]
 
         elif name == "sync_to_google":
             service = get_gcal_service()
             calendar_id = (arguments or {}).get("calendar_id", "primary")
 
-            items = session_data.get("assignments") or []
-            if not items:
-                return [TextContent(
-                    type="text",
-                    text="No assignments/events found. Run 'fetch_all_assignments' (and optionally 'scan_syllabus') first."
-                )]
-
-            synced = 0
-            errors: list[str] = []
-            for it in items:
-                try:
-                    create_google_event(service, it, calendar_id=calendar_id)
-                    synced += 1
-                except Exception as e:
-                    errors.append(f"{it.get('name')}: {e}")
-
-            msg = f"Google Calendar: synced {synced} item(s) → {calendar_id}"
-            if errors:
-                msg += "\n\nErrors:\n" + "\n".join(errors[:20])
-
-            return [TextContent(type="text", text=msg)]
+            with sync_target_lock(f"google:{calendar_id}"):
+                items = ITEM_STORE.items()
+                if not items:
+                    return [TextContent(
+                        type="text",
+                        text="No assignments/events found. Run 'fetch_all_assignments' (and optionally 'scan_syllabus') first."
+                    )]
+
+                target = f"google:{calendar_id}"
+                total = len(items)
+                index = reconcile_gcal_index(service, calendar_id)
+                if (arguments or {}).get("incremental"):
+                    items = filter_changed_items(items, target, index)
+
+                synced = 0
+                errors: list[str] = []
+                ok_items: list[dict] = []
+                failed_items: list[dict] = []
+                upserts = batch_upsert_google_events(
+                    service, items, calendar_id=calendar_id, index_complete=True
+                )
+                for it, _, err in upserts:
+                    if err is None:
+                        synced += 1
+                        ok_items.append(it)
+                    else:
+                        errors.append(f"{it.get('name')}: {err}")
+                        failed_items.append(it)
+                advance_watermarks(ok_items, failed_items, target)
+
+                deleted = 0
+                if (arguments or {}).get("prune") and len(items) == total:
+                    deleted, prune_errors = delete_google_orphans(service, index, items, calendar_id)
+                    errors.extend(prune_errors)
+
+                msg = f"Google Calendar: synced {synced} item(s) → {calendar_id}"
+                if len(items) < total:
+                    msg += f" ({total - len(items)} unchanged skipped)"
+                if deleted:
+                    msg += f", removed {deleted} orphaned event(s)"
+                if errors:
+                    msg += "\n\nErrors:\n" + "\n".join(errors[:20])
+
+                return [TextContent(type="text", text=msg)]
 
         else:
             return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
+    except ToolCancelled:
+        return [TextContent(type="text", text=f"{name} cancelled")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error executing {name}: {e}")]
 
@@ -693,7 +2898,24 @@ async def list_resources() -> List[Resource]:
         Resource(
             uri="canvas://assignments",
             name="Canvas Assignments",
-            description="All fetched assignments and events",
+            description="Fetched assignments and events, one page at a time (see the canvas://assignments template)",
+            mimeType="application/json"
+        )
+    ]
+
+
+@server.list_resource_templates()
+async def list_resource_templates() -> List[ResourceTemplate]:
+    """Define parameterized resources"""
+    return [
+        ResourceTemplate(
+            uriTemplate="canvas://assignments{?course,type,since,until,cursor,limit}",
+            name="Canvas Assignments (filtered)",
+            description=(
+                "Fetched items filtered by course id, type (assignment/event), due/start "
+                "time (since inclusive, until exclusive, ISO); limit items per page, "
+                "follow 'next' for the following page"
+            ),
             mimeType="application/json"
         )
     ]
@@ -702,11 +2924,13 @@ async def list_resources() -> List[Resource]:
 @server.read_resource()
 async def read_resource(uri: str) -> str:
     """Provide resource content"""
-    if uri == "canvas://courses":
-        return json.dumps(session_data["courses"], indent=2)
+    parts = urlsplit(str(uri))
+    base = f"{parts.scheme}://{parts.netloc}{parts.path}"
+    if base == "canvas://courses":
+        return _compact_json(ITEM_STORE.courses())
     
-    elif uri == "canvas://assignments":
-        return json.dumps(session_data["assignments"], indent=2)
+    elif base == "canvas://assignments":
+        return _read_items_resource(dict(parse_qsl(parts.query)))
     
     else:
         raise ValueError(f"Unknown resource: {uri}")